@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline benchmarks: recorded fixture pages, a local mock server and the runner
+"""
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare two benchmark result files written by benchmarks/run.py
+
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+
+import sys
+import json
+import argparse
+
+# Metrics where a smaller value is better; everything else is a rate
+LOWER_IS_BETTER = ('_ms', 'seconds', 'rss_mb', 'rss_increase_mb', 'retries', 'failed')
+
+# Not measurements, only context of a row
+IGNORED = ('chapters', 'page_kb', 'size_mb', 'server_errors')
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def flatten(results, prefix=''):
+    """{'crawl': {'x': {'4': {'seconds': 1}}}} -> {'crawl.x.4.seconds': 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def print_comparison(base, new):
+    """
+    Print every metric present in both runs with its relative change
+
+    Args:
+        base: Decoded result file of the reference run
+        new: Decoded result file of the run to compare
+    """
+    def describe(run):
+        commit = (run.get('commit') or '?')[:8]
+        return f"{commit}{' (dirty)' if run.get('dirty') else ''} {run.get('timestamp', '')}"
+
+    print(f"\nSo sánh {describe(base)} -> {describe(new)}")
+    if base.get('params') != new.get('params'):
+        print("  ! Tham số hai lần chạy khác nhau, kết quả có thể không so sánh được")
+
+    old_metrics = flatten(base.get('results', {}))
+    new_metrics = flatten(new.get('results', {}))
+    for name, new_value in new_metrics.items():
+        if name not in old_metrics or name.rsplit('.', 1)[-1] in IGNORED:
+            continue
+        old_value = old_metrics[name]
+        if not old_value:
+            continue
+        change = (new_value - old_value) / old_value * 100
+        better = change < 0 if name.endswith(LOWER_IS_BETTER) else change > 0
+        mark = ' ' if abs(change) < 5 else ('+' if better else '-')
+        print(f"  {mark} {name:<60} {old_value:10.2f} -> {new_value:10.2f}  ({change:+6.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh hai file kết quả benchmark")
+    parser.add_argument('base', help="Kết quả tham chiếu (ví dụ của commit trước)")
+    parser.add_argument('new', help="Kết quả cần so sánh")
+    args = parser.parse_args(argv)
+    print_comparison(load_results(args.base), load_results(args.new))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
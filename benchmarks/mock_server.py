@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local stand-in for metruyenchu.com.vn and metruyenhot.me
+
+Serves the recorded pages in benchmarks/fixtures for one novel per
+source, with any number of chapters, on 127.0.0.1. Every response can be
+delayed (latency + random jitter) and chapter pages can fail with a 500
+or be throttled with a 429, so the crawler can be measured offline.
+
+Fixtures are templates: $slug, $novel_id, $total, $chapter, $prev, $next
+and $latest0..$latest4 are filled in for each request.
+
+Run it on its own to try the interactive CLI against it:
+
+    python -m benchmarks.mock_server --chapters 500 --latency 0.05
+    python main.py    # pick the source by number, paste the printed URL
+
+Only the interactive mode works this way. Passing the URL on the command
+line does not: sources are chosen by host there, and 127.0.0.1 matches
+none of them. Scripts can call the source classes directly instead, as
+benchmarks/run.py does.
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import time
+import random
+import argparse
+import threading
+from string import Template
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+CHU_SLUG = 'thanh-van-kiem-dao'
+HOT_SLUG = 'thanh-van-kiem-dao-hot'
+NOVEL_ID = 48213
+
+# Chapters per listchap page, as on the real site
+LISTCHAP_PAGE_SIZE = 100
+
+LISTCHAP_ITEM_PATTERN = re.compile(r'<li\b.*?</li>', re.S)
+CHAPTER_NUMBER_PATTERN = re.compile(r'(chuong-|Chương )(\d+)')
+
+
+def load_fixture(name, binary=False):
+    """Read a file from benchmarks/fixtures"""
+    path = os.path.join(FIXTURES_DIR, name)
+    if binary:
+        with open(path, 'rb') as f:
+            return f.read()
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class MockSite:
+    """
+    Threaded HTTP server playing both sources
+
+    Usage:
+        with MockSite(chapters=200, latency=0.02) as site:
+            source.parse_novel_url(site.novel_url('metruyenchu.com.vn'))
+    """
+
+    def __init__(self, chapters=200, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=0, seed=None, port=0):
+        """
+        Args:
+            chapters: Number of chapters of the novel
+            latency: Delay added to every response (seconds)
+            jitter: Extra random delay, uniform in [0, jitter] (seconds)
+            error_rate: Share of chapter requests answered with 500
+            throttle_rate: Share of chapter requests answered with 429
+            retry_after: Retry-After sent with a 429 (seconds)
+            seed: Seed of the fault injection, for repeatable runs (optional)
+            port: Port to listen on (0 = any free port)
+        """
+        self.chapters = chapters
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.port = port
+
+        self.templates = {
+            'chu_novel': Template(load_fixture('metruyenchu_com_vn/novel.html')),
+            'chu_chapter': Template(load_fixture('metruyenchu_com_vn/chapter.html')),
+            'hot_novel': Template(load_fixture('metruyenhot_me/novel.html')),
+            'hot_chapter': Template(load_fixture('metruyenhot_me/chapter.html')),
+        }
+        self.listchap = json.loads(load_fixture('metruyenchu_com_vn/listchap.json'))
+        self.listchap_items = LISTCHAP_ITEM_PATTERN.findall(html.unescape(self.listchap['data']))
+        self.cover = load_fixture('cover.png', binary=True)
+
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'throttled': 0, 'bytes': 0}
+        self.server = None
+        self.thread = None
+
+        self.routes = [
+            (re.compile(rf'^/{CHU_SLUG}/?$'), self._chu_novel),
+            (re.compile(rf'^/get/listchap/{NOVEL_ID}\?page=(\d+)$'), self._chu_listchap),
+            (re.compile(rf'^/{CHU_SLUG}/chuong-(\d+)$'), self._chu_chapter),
+            (re.compile(rf'^/{HOT_SLUG}/?$'), self._hot_novel),
+            (re.compile(rf'^/{HOT_SLUG}/chuong-(\d+)/$'), self._hot_chapter),
+            (re.compile(r'^/cover\.png$'), self._cover),
+        ]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def novel_url(self, source_name):
+        """URL of the benchmark novel for a source name"""
+        if source_name == 'metruyenchu.com.vn':
+            return f"{self.base_url}/{CHU_SLUG}"
+        if source_name == 'metruyenhot.me':
+            return f"{self.base_url}/{HOT_SLUG}/"
+        raise ValueError(f"Không có fixture cho nguồn {source_name}")
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                site._handle(self, head=True)
+
+            def do_GET(self):
+                site._handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self.lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+
+    def _handle(self, handler, head=False):
+        self._count('requests')
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        for pattern, route in self.routes:
+            match = pattern.match(handler.path)
+            if match:
+                status, content_type, body, headers = route(*match.groups())
+                break
+        else:
+            status, content_type, body, headers = 404, 'text/plain', b'Not found', {}
+
+        try:
+            handler.send_response(status)
+            handler.send_header('Content-Type', content_type)
+            handler.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.end_headers()
+            if not head:
+                handler.wfile.write(body)
+                self._count('bytes', len(body))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the request (e.g. a hedged request that lost the race)
+            handler.close_connection = True
+
+    def _fault(self):
+        """Injected failure for a chapter request, or None"""
+        roll = self.random.random()
+        if roll < self.error_rate:
+            self._count('errors')
+            return 500, 'text/plain', b'Internal Server Error', {}
+        if roll < self.error_rate + self.throttle_rate:
+            self._count('throttled')
+            return 429, 'text/plain', b'Too Many Requests', {'Retry-After': str(self.retry_after)}
+        return None
+
+    def _render(self, name, **values):
+        values.setdefault('slug', CHU_SLUG if name.startswith('chu') else HOT_SLUG)
+        body = self.templates[name].safe_substitute(novel_id=NOVEL_ID, total=self.chapters, **values)
+        return 200, 'text/html; charset=utf-8', body.encode('utf-8'), {}
+
+    def chapter_html(self, source_name, number=1):
+        """Chapter page as served to a source, without going through HTTP"""
+        name = 'chu_chapter' if source_name == 'metruyenchu.com.vn' else 'hot_chapter'
+        return self._render(name, **self._chapter_values(number))[2].decode('utf-8')
+
+    def _chapter_values(self, number):
+        return {'chapter': number, 'prev': max(1, number - 1), 'next': min(self.chapters, number + 1)}
+
+    def _chu_novel(self):
+        return self._render('chu_novel')
+
+    def _chu_listchap(self, page):
+        # Renumber the recorded page 1 into page `page`
+        first = (int(page) - 1) * LISTCHAP_PAGE_SIZE + 1
+        items = []
+        for offset, item in enumerate(self.listchap_items):
+            number = first + offset
+            if number > self.chapters:
+                break
+            items.append(CHAPTER_NUMBER_PATTERN.sub(lambda m: f"{m.group(1)}{number}", item))
+
+        data = {'data': ''}
+        if items:
+            data = dict(self.listchap)
+            data['data'] = html.escape('<ul class="list-chapter">' + ''.join(items) + '</ul>')
+        body = Template(json.dumps(data, ensure_ascii=False)).safe_substitute(slug=CHU_SLUG)
+        return 200, 'application/json', body.encode('utf-8'), {}
+
+    def _chu_chapter(self, number):
+        number = int(number)
+        if not 1 <= number <= self.chapters:
+            return 404, 'text/plain', b'Not found', {}
+        return self._fault() or self._render('chu_chapter', **self._chapter_values(number))
+
+    def _hot_novel(self):
+        latest = {f'latest{k}': max(1, self.chapters - k) for k in range(5)}
+        return self._render('hot_novel', **latest)
+
+    def _hot_chapter(self, number):
+        number = int(number)
+        if not 1 <= number <= self.chapters:
+            return 404, 'text/plain', b'Not found', {}
+        return self._fault() or self._render('hot_chapter', **self._chapter_values(number))
+
+    def _cover(self):
+        return 200, 'image/png', self.cover, {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Máy chủ giả lập các nguồn truyện để đo hiệu năng")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--chapters', type=int, default=200, help="Số chương của truyện mẫu")
+    parser.add_argument('--latency', type=float, default=0.0, help="Độ trễ mỗi response (giây)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Độ trễ ngẫu nhiên thêm vào (giây)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Tỉ lệ chương trả về 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Tỉ lệ chương trả về 429")
+    args = parser.parse_args(argv)
+
+    site = MockSite(chapters=args.chapters, latency=args.latency, jitter=args.jitter,
+                    error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                    port=args.port).start()
+    print(f"✓ metruyenchu.com.vn: {site.novel_url('metruyenchu.com.vn')}")
+    print(f"✓ metruyenhot.me: {site.novel_url('metruyenhot.me')}")
+    print("Chạy `python main.py` (chế độ hỏi-đáp), chọn nguồn rồi dán link ở trên.")
+    try:
+        site.thread.join()
+    except KeyboardInterrupt:
+        site.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
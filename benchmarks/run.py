@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline benchmark suite
+
+Measures, against benchmarks/mock_server.py and the recorded fixtures:
+
+    parse   CPU time of _parse_chapter_page and of clean_chapter_content
+            per chapter, for each source
+    crawl   end-to-end chapters/s of crawl_all_chapters for each source
+            and each number of workers (scaling with concurrency)
+    epub    wall time and peak RSS of EpubCreator.create_epub and
+            create_epub_streaming, each in a fresh process
+
+Results are written as JSON together with the git commit, Python version
+and parameters, so runs on different commits can be compared with
+benchmarks/compare.py:
+
+    python -m benchmarks.run --chapters 300 --workers 1,4,16 --latency 0.02
+    python -m benchmarks.compare results/old.json results/new.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from benchmarks.mock_server import MockSite, load_fixture  # noqa: E402
+from epub_creator import EpubCreator  # noqa: E402
+from sources.metruyenchu_com_vn import MetruyenchuComVnSource  # noqa: E402
+from sources.metruyenhot_me import MetruyenhotMeSource  # noqa: E402
+from sources.parser import make_soup, PARSER  # noqa: E402
+from sources.cleaner import clean_chapter_content  # noqa: E402
+from sources.rate_limiter import HostRateLimiter  # noqa: E402
+from sources.metrics import CrawlMetrics  # noqa: E402
+from sources.progress import no_progress  # noqa: E402
+
+BENCHMARK_SOURCES = [MetruyenchuComVnSource, MetruyenhotMeSource]
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+ALL_BENCHMARKS = ('parse', 'crawl', 'epub')
+
+
+def git_info():
+    """Commit the benchmark runs on, and whether the tree has local changes"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    try:
+        return {
+            'commit': git('rev-parse', 'HEAD'),
+            'subject': git('log', '-1', '--format=%s'),
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        }
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'subject': None, 'dirty': None}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (MB), None when unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def bench_parse(iterations):
+    """CPU time per chapter of parsing (cleaning included) and of cleaning alone"""
+    site = MockSite()
+    results = {}
+    for source_class in BENCHMARK_SOURCES:
+        source = source_class()
+        page_html = site.chapter_html(source.name)
+
+        parse_cpu = 0.0
+        for _ in range(iterations):
+            started = time.process_time()
+            source._parse_chapter_page(page_html)
+            parse_cpu += time.process_time() - started
+
+        clean_cpu = 0.0
+        for _ in range(iterations):
+            content_div = source.spec.select_one(make_soup(page_html), 'content')
+            started = time.process_time()
+            clean_chapter_content(content_div)
+            clean_cpu += time.process_time() - started
+
+        results[source.name] = {
+            'page_kb': len(page_html.encode('utf-8')) / 1024,
+            'parse_cpu_ms': parse_cpu / iterations * 1000,
+            'clean_cpu_ms': clean_cpu / iterations * 1000,
+            'chapters_per_cpu_second': iterations / parse_cpu if parse_cpu else None,
+        }
+    return results
+
+
+def bench_crawl(site, workers_list, parse_processes):
+    """chapters/s of crawl_all_chapters for each source and number of workers"""
+    results = {}
+    for source_class in BENCHMARK_SOURCES:
+        by_workers = {}
+        for workers in workers_list:
+            source = source_class()
+            metrics = CrawlMetrics()
+            # Rate limiting would hide the scaling being measured
+            rate_limiter = HostRateLimiter(rate=1e9, capacity=1e9)
+            with redirect_stdout(io.StringIO()):
+                novel_info = source.parse_novel_url(site.novel_url(source.name))
+                chapters = source.get_chapter_list(novel_info, delay=0)
+                site.reset_stats()
+                started = time.perf_counter()
+                source.crawl_all_chapters(chapters, delay=0, workers=workers, rate_limiter=rate_limiter,
+                                          cache=False, parse_processes=parse_processes, metrics=metrics,
+                                          progress=no_progress)
+                elapsed = time.perf_counter() - started
+
+            summary = metrics.summary()
+            by_workers[str(workers)] = {
+                'chapters': len(chapters),
+                'seconds': elapsed,
+                'chapters_per_second': len(chapters) / elapsed,
+                'mb_per_second': site.stats['bytes'] / elapsed / (1024 * 1024),
+                'ttfb_ms': summary['ttfb_average'] * 1000,
+                'parse_ms': summary['stages']['parse']['average'] * 1000,
+                'retries': summary['retries'],
+                'hedges': summary['hedges'],
+                'failed': summary['outcomes']['failed'],
+                'server_errors': site.stats['errors'] + site.stats['throttled'],
+            }
+        results[source_class.name] = by_workers
+    return results
+
+
+def _epub_worker(method, chapters_count):
+    """Build an EPUB in this (fresh) process and report its time and memory"""
+    source = MetruyenhotMeSource()
+    page_html = MockSite().chapter_html(source.name)
+    _, content = source._parse_chapter_page(page_html)
+
+    chapters = [
+        {'title': f"Chương {i}", 'url': f"https://example.invalid/chuong-{i}/",
+         'slug': f"chuong-{i}", 'content': content}
+        for i in range(1, chapters_count + 1)
+    ]
+    creator = EpubCreator("Thanh Vân Kiếm Đạo", "Mộc Phong", 1, "Mô tả",
+                          cover_image=load_fixture('cover.png', binary=True))
+
+    before = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'bench.epub')
+        with redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            if method == 'create_epub':
+                creator.create_epub(chapters, output)
+            else:
+                creator.create_epub_streaming(iter(chapters), output)
+            elapsed = time.perf_counter() - started
+        size = os.path.getsize(output)
+    after = peak_rss_mb()
+
+    return {
+        'chapters': chapters_count,
+        'seconds': elapsed,
+        'size_mb': size / (1024 * 1024),
+        'peak_rss_mb': after,
+        'rss_increase_mb': after - before if after is not None else None,
+    }
+
+
+def bench_epub(chapters_count):
+    """Time and peak RSS of both EPUB writers, each measured in its own process"""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for method in ('create_epub', 'create_epub_streaming'):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[method] = executor.submit(_epub_worker, method, chapters_count).result()
+    return results
+
+
+def print_results(results):
+    """Print the results of a run as short tables"""
+    if 'parse' in results:
+        print("\nparse (CPU / chương):")
+        for name, row in results['parse'].items():
+            print(f"  {name:<20} parse {row['parse_cpu_ms']:7.2f} ms   clean {row['clean_cpu_ms']:7.2f} ms"
+                  f"   ({row['page_kb']:.0f} KB/trang)")
+    if 'crawl' in results:
+        print("\ncrawl (chương/s theo số worker):")
+        for name, by_workers in results['crawl'].items():
+            cells = '   '.join(f"{workers}: {row['chapters_per_second']:7.1f}" for workers, row in by_workers.items())
+            print(f"  {name:<20} {cells}")
+    if 'epub' in results:
+        print("\nepub:")
+        for method, row in results['epub'].items():
+            rss = f"{row['peak_rss_mb']:.0f} MB (+{row['rss_increase_mb']:.0f} MB)" if row['peak_rss_mb'] else "không rõ"
+            print(f"  {method:<22} {row['seconds']:6.2f}s   RSS đỉnh {rss}   {row['size_mb']:.1f} MB")
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Đo hiệu năng offline với máy chủ giả lập")
+    parser.add_argument('--only', default=','.join(ALL_BENCHMARKS),
+                        help=f"Các phép đo cần chạy, cách nhau bởi dấu phẩy (mặc định: {','.join(ALL_BENCHMARKS)})")
+    parser.add_argument('--chapters', type=int, default=200, help="Số chương tải trong phép đo crawl")
+    parser.add_argument('--workers', default='1,2,4,8,16', help="Các số worker cần đo, cách nhau bởi dấu phẩy")
+    parser.add_argument('--parse-processes', type=int, default=0, help="Số process phân tích HTML khi crawl")
+    parser.add_argument('--latency', type=float, default=0.02, help="Độ trễ của máy chủ giả lập (giây)")
+    parser.add_argument('--jitter', type=float, default=0.01, help="Độ trễ ngẫu nhiên thêm vào (giây)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Tỉ lệ chương trả về 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Tỉ lệ chương trả về 429")
+    parser.add_argument('--parse-iterations', type=int, default=50, help="Số lần phân tích mỗi trang mẫu")
+    parser.add_argument('--epub-chapters', type=int, default=2000, help="Số chương của EPUB trong phép đo epub")
+    parser.add_argument('--seed', type=int, default=1, help="Seed cho lỗi giả lập")
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help="File JSON kết quả (mặc định: benchmarks/results/<thời gian>-<commit>.json)")
+    parser.add_argument('--compare', metavar='BASE',
+                        help="So sánh với một file kết quả trước đó")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(ALL_BENCHMARKS)
+    if unknown:
+        print(f"✗ Không có phép đo: {', '.join(sorted(unknown))}")
+        return 2
+    workers_list = [int(value) for value in args.workers.split(',')]
+
+    params = {
+        'chapters': args.chapters, 'workers': workers_list, 'parse_processes': args.parse_processes,
+        'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate, 'parse_iterations': args.parse_iterations,
+        'epub_chapters': args.epub_chapters, 'seed': args.seed,
+    }
+    run = {
+        **git_info(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'html_parser': PARSER,
+        'params': params,
+        'results': {},
+    }
+
+    if 'parse' in selected:
+        print("Đang đo parse...")
+        run['results']['parse'] = bench_parse(args.parse_iterations)
+    if 'crawl' in selected:
+        print("Đang đo crawl...")
+        with MockSite(chapters=args.chapters, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                      seed=args.seed) as site:
+            run['results']['crawl'] = bench_crawl(site, workers_list, args.parse_processes)
+    if 'epub' in selected:
+        print("Đang đo epub...")
+        run['results']['epub'] = bench_epub(args.epub_chapters)
+
+    print_results(run['results'])
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(run['commit'] or 'nogit')[:8]}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, ensure_ascii=False, indent=1)
+    print(f"\n✓ Đã ghi kết quả: {output}")
+
+    if args.compare:
+        from benchmarks.compare import load_results, print_comparison
+        print_comparison(load_results(args.compare), run)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,8 +10,63 @@ DEFAULT_HEADERS = {
 DEFAULT_DELAY_BETWEEN_REQUESTS = 1.0
 DEFAULT_CHAPTER_LIST_DELAY = 0.5
 DEFAULT_MAX_RETRIES = 3
-DEFAULT_TIMEOUT = 30
+DEFAULT_CONNECT_TIMEOUT = 5  # seconds to open a connection
+DEFAULT_READ_TIMEOUT = 30  # seconds without receiving any data
+DEFAULT_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
 CHAPTERS_PER_PAGE = 100
+DEFAULT_CHAPTER_LIST_WORKERS = 8
+PROBE_MAX_BYTES = 512 * 1024  # probe() stops reading the novel page after this many bytes
+PROBE_CHUNK_SIZE = 16 * 1024
+
+# HTML parser used by BeautifulSoup: None = auto (lxml if installed, else html.parser)
+HTML_PARSER = None
+
+# Adaptive per-host congestion control (AIMD)
+ADAPTIVE_INITIAL_CONCURRENCY = 2
+ADAPTIVE_MIN_CONCURRENCY = 1
+ADAPTIVE_MAX_CONCURRENCY = 16
+ADAPTIVE_MAX_RATE_PER_HOST = 16.0  # requests per second, however large the window grows
+ADAPTIVE_LATENCY_TOLERANCE = 2.0  # latency above this multiple of the best seen counts as congestion
+DEFAULT_BACKOFF_MAX = 60  # seconds
+
+# Concurrent crawl settings
+DEFAULT_CRAWL_WORKERS = ADAPTIVE_MAX_CONCURRENCY  # upper bound; the per-host window decides how many run
+DEFAULT_RATE_LIMIT_PER_HOST = 4.0  # requests per second at the initial window
+DEFAULT_RATE_LIMIT_BURST = 4
+DEFAULT_PARSE_PROCESSES = 0  # parser processes, 0 = parse in the download threads
+
+# Chapter cache settings
+CHAPTER_CACHE_ENABLED = True
+CHAPTER_CACHE_PATH = '.cache/chapters.sqlite3'
+CHAPTER_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# HTTP cache (revalidates novel pages, covers and chapter lists with ETag/Last-Modified)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = '.cache/http.sqlite3'
+
+# Hedged chapter requests: a request slower than the HEDGE_QUANTILE of
+# recent latencies is sent again and the first answer is used
+HEDGE_ENABLED = True
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20  # latencies measured before hedging starts
+HEDGE_WINDOW = 200  # recent latencies kept per source
+HEDGE_MIN_DELAY = 0.05  # seconds
+HEDGE_MAX_RATIO = 0.1  # at most this share of requests is hedged
+
+# Mirror mode: the same novel crawled from several sources
+MIRROR_HEDGE_DELAY = 3.0  # seconds before the next mirror is raced against a slow one (None = never)
+MIRROR_FAILURE_LIMIT = 3  # consecutive failures before a mirror is set aside
+MIRROR_COOLDOWN = 60  # seconds a failing mirror is set aside
+MIRROR_FETCH_THREADS = 32
+
+# Checkpoint journals for resumable crawls
+CHECKPOINT_DIR = '.checkpoints'
+
+# Cover image (resizing and recompression need Pillow, otherwise the cover is kept as is)
+COVER_MAX_WIDTH = 1200
+COVER_MAX_HEIGHT = 1800
+COVER_MAX_BYTES = 300 * 1024  # recompress covers larger than this
+COVER_JPEG_QUALITY = 85
 
 # EPUB CSS Style
 EPUB_CSS_STYLE = '''
@@ -1,18 +1,432 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import re
+import html
+import json
 import time
+import shutil
+import zipfile
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from ebooklib import epub
-from config import EPUB_CSS_STYLE
+from lxml import etree, html as lxml_html
+from config import (
+    EPUB_CSS_STYLE, COVER_MAX_WIDTH, COVER_MAX_HEIGHT, COVER_MAX_BYTES, COVER_JPEG_QUALITY
+)
+from sources.chapter import Chapter
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+CONTAINER_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<container xmlns="urn:oasis:names:tc:opendocument:xmlns:container" version="1.0">
+  <rootfiles>
+    <rootfile full-path="EPUB/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+'''
+
+CHAPTER_XHTML = '''<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="vi" xml:lang="vi">
+<head>
+  <title>{title}</title>
+  <link href="style/nav.css" rel="stylesheet" type="text/css"/>
+</head>
+<body>
+<h1>{title}</h1>
+{content}
+</body>
+</html>
+'''
+
+
+# Machine-readable list of the chapters in the book, used to update it later
+CHAPTER_INDEX_FILE = 'chapters.json'
+
+# Magic bytes -> (media type, file extension) of cover images
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', 'png'),
+    (b'GIF87a', 'image/gif', 'gif'),
+    (b'GIF89a', 'image/gif', 'gif'),
+]
+
+# Image types every EPUB reader supports
+CORE_IMAGE_TYPES = {'image/jpeg', 'image/png', 'image/gif'}
+
+
+def to_xhtml_fragment(content):
+    """
+    Re-serialize an HTML fragment as well-formed XHTML
+
+    Chapter content comes from tag soup (e.g. '</p><p>' spliced into a
+    div), which ebooklib repairs on write. The streaming writer has to do
+    the same before putting the fragment in an XHTML file.
+    """
+    root = lxml_html.fragment_fromstring(content, create_parent='div')
+    return etree.tostring(root, method='xml', encoding='unicode')
+
+
+def detect_image_type(data):
+    """
+    Detect the format of an image from its first bytes
+
+    Returns:
+        Tuple (media type, file extension), or None if the format is unknown
+    """
+    for signature, media_type, extension in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return media_type, extension
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    return None
+
+
+def prepare_cover(data):
+    """
+    Turn downloaded cover bytes into an image fit for the EPUB
+
+    The format is detected from the content, not from the URL. With Pillow
+    installed, covers larger than COVER_MAX_WIDTH x COVER_MAX_HEIGHT or
+    COVER_MAX_BYTES, or not in a core EPUB format, are downscaled and
+    re-encoded as JPEG.
+
+    Args:
+        data: Image bytes (or None)
+
+    Returns:
+        Tuple (bytes, media type, file extension), or None if there is no usable image
+    """
+    if not data:
+        return None
+
+    detected = detect_image_type(data)
+    if Image is None:
+        if detected is None:
+            print("✗ Ảnh bìa không đúng định dạng, bỏ qua")
+            return None
+        return (data, *detected)
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        print(f"✗ Ảnh bìa không đúng định dạng, bỏ qua ({e})")
+        return None
+
+    if (detected and detected[0] in CORE_IMAGE_TYPES and len(data) <= COVER_MAX_BYTES
+            and image.width <= COVER_MAX_WIDTH and image.height <= COVER_MAX_HEIGHT):
+        return (data, *detected)
+
+    image.thumbnail((COVER_MAX_WIDTH, COVER_MAX_HEIGHT))
+    if image.mode not in ('RGB', 'L'):
+        # JPEG has no alpha channel, flatten onto white
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, 'white')
+        image.paste(rgba, mask=rgba.getchannel('A'))
+
+    quality = COVER_JPEG_QUALITY
+    while True:
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=quality, optimize=True)
+        if output.tell() <= COVER_MAX_BYTES or quality <= 50:
+            break
+        quality -= 10
+
+    return output.getvalue(), 'image/jpeg', 'jpg'
+
+
+def load_cover(cover_image):
+    """
+    Prepare a cover given as bytes or as a Future of bytes
+
+    A Future lets the cover download run while chapters are crawled; it
+    is only waited for when the cover is written.
+
+    Returns:
+        Same as prepare_cover
+    """
+    if cover_image is not None and hasattr(cover_image, 'result'):
+        cover_image = cover_image.result()
+    return prepare_cover(cover_image)
+
+
+def build_chapter_index(identifier, title, author, description, language,
+                        novel_url, cover, chapters):
+    """
+    Serialize the chapter index embedded in every EPUB we create
+
+    Args:
+        identifier: Unique identifier of the book
+        title: Title of the novel
+        author: Author of the novel
+        description: Description of the novel
+        language: Book language
+        novel_url: URL of the novel page the book was crawled from
+        cover: File name of the cover image inside EPUB/, or None
+        chapters: List of dicts with 'file', 'title', 'url' and 'slug'
+
+    Returns:
+        JSON string
+    """
+    return json.dumps({
+        'version': 1,
+        'identifier': identifier,
+        'title': title,
+        'author': author,
+        'description': description,
+        'language': language,
+        'novel_url': novel_url,
+        'cover': cover,
+        'chapters': chapters
+    }, ensure_ascii=False, indent=1)
+
+
+def read_chapter_index(epub_filename):
+    """
+    Read the chapter index of an EPUB created by EpubCreator
+
+    Returns:
+        dict (see build_chapter_index) or None if the book has no index
+    """
+    with zipfile.ZipFile(epub_filename) as book:
+        try:
+            data = book.read(f'EPUB/{CHAPTER_INDEX_FILE}')
+        except KeyError:
+            return None
+    return json.loads(data)
+
+
+class StreamingEpubWriter:
+    """
+    Write an EPUB 3 file chapter by chapter
+
+    Each chapter is compressed into the zip as soon as it is added; only
+    its file name, title and URL are kept. The package document, NCX and nav
+    are written by close(), so memory use does not grow with chapter
+    content.
+    """
+
+    # Entries written before the chapters; close() writes the rest after them
+    LEADING_ENTRIES = ('mimetype', 'META-INF/container.xml', 'EPUB/style/nav.css')
+
+    def __init__(self, output_filename, identifier, title, author,
+                 description=None, cover_image=None, language='vi', novel_url=None,
+                 existing_chapters=None):
+        """
+        Args:
+            output_filename: Path of the EPUB to write
+            identifier: Unique identifier of the book
+            title: Title of the novel
+            author: Author of the novel
+            description: Description of the novel (optional)
+            cover_image: Cover image as bytes or a Future of bytes (optional)
+            language: Book language
+            novel_url: URL of the novel page, stored in the chapter index (optional)
+            existing_chapters: Chapter index entries of an EPUB this class wrote
+                at output_filename; its chapters are kept and new ones are
+                added after them (optional)
+        """
+        self.output_filename = output_filename
+        self.identifier = identifier
+        self.title = title
+        self.author = author
+        self.description = description
+        self.cover_image = cover_image
+        self.language = language
+        self.novel_url = novel_url
+        self.toc = []
+        self.chapter_index = []
+
+        # Written to a temporary file and renamed on close, so an interrupted
+        # crawl never leaves a truncated EPUB behind
+        self.temp_filename = f"{output_filename}.part"
+        if existing_chapters is None:
+            self._start_archive()
+        else:
+            self._continue_archive(existing_chapters)
+
+    def _start_archive(self):
+        self.zip = zipfile.ZipFile(self.temp_filename, 'w', zipfile.ZIP_DEFLATED)
+
+        # mimetype must be the first entry and stored uncompressed
+        self.zip.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        self.zip.writestr('META-INF/container.xml', CONTAINER_XML)
+        self.zip.writestr('EPUB/style/nav.css', EPUB_CSS_STYLE)
+
+    def _continue_archive(self, existing_chapters):
+        """
+        Start from a copy of output_filename with its chapters left compressed
+
+        The files close() rebuilds come after the chapters in the archive, so
+        they are cut off the end and new chapters are written in their place.
+        An archive laid out differently (rewritten by another tool) has its
+        chapters copied one by one instead.
+        """
+        shutil.copyfile(self.output_filename, self.temp_filename)
+        self.zip = zipfile.ZipFile(self.temp_filename, 'a', zipfile.ZIP_DEFLATED)
+
+        kept_names = set(self.LEADING_ENTRIES)
+        kept_names.update(f"EPUB/{entry['file']}" for entry in existing_chapters)
+        kept = [info for info in self.zip.infolist() if info.filename in kept_names]
+        rebuilt = [info for info in self.zip.infolist() if info.filename not in kept_names]
+        end_of_kept = max((info.header_offset for info in kept), default=-1)
+        if len(kept) == len(kept_names) and all(info.header_offset > end_of_kept for info in rebuilt):
+            # zipfile cannot remove entries: forget the rebuilt ones and let
+            # the next entries overwrite them (the file is truncated on close)
+            self.zip.filelist = kept
+            self.zip.NameToInfo = {info.filename: info for info in kept}
+            if rebuilt:
+                self.zip.start_dir = min(info.header_offset for info in rebuilt)
+            for entry in existing_chapters:
+                self._index_chapter(entry['file'], entry['title'], entry.get('url'), entry.get('slug'))
+            return
+
+        self.zip.close()
+        self._start_archive()
+        with zipfile.ZipFile(self.output_filename) as book:
+            for entry in existing_chapters:
+                self.add_chapter_file(entry['file'], entry['title'], book.read(f"EPUB/{entry['file']}"),
+                                      entry.get('url'), entry.get('slug'))
+
+    def add_chapter(self, title, content, url=None, slug=None):
+        """
+        Write one chapter into the EPUB
+
+        Args:
+            title: Chapter title
+            content: Chapter content (HTML)
+            url: URL of the chapter (optional, stored in the chapter index)
+            slug: Slug of the chapter (optional, stored in the chapter index)
+        """
+        chapter_xhtml = CHAPTER_XHTML.format(
+            title=html.escape(title),
+            content=to_xhtml_fragment(content)
+        )
+        self.add_chapter_file(f'chapter_{len(self.toc) + 1}.xhtml', title, chapter_xhtml, url, slug)
+
+    def add_chapter_file(self, file_name, title, chapter_xhtml, url=None, slug=None):
+        """
+        Write an already rendered chapter file (e.g. copied from another EPUB)
+
+        Args:
+            file_name: File name inside EPUB/
+            title: Chapter title
+            chapter_xhtml: XHTML document (str or bytes)
+            url: URL of the chapter (optional)
+            slug: Slug of the chapter (optional)
+        """
+        self.zip.writestr(f'EPUB/{file_name}', chapter_xhtml)
+        self._index_chapter(file_name, title, url, slug)
+
+    def _index_chapter(self, file_name, title, url, slug):
+        self.toc.append((file_name, title))
+        self.chapter_index.append({'file': file_name, 'title': title, 'url': url, 'slug': slug})
+
+    def _package_document(self, cover):
+        modified = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        metadata = [
+            f'<dc:identifier id="id">{html.escape(self.identifier)}</dc:identifier>',
+            f'<dc:title>{html.escape(self.title)}</dc:title>',
+            f'<dc:language>{self.language}</dc:language>',
+            f'<dc:creator id="creator">{html.escape(self.author)}</dc:creator>',
+            f'<meta property="dcterms:modified">{modified}</meta>',
+        ]
+        if self.description:
+            metadata.append(f'<dc:description>{html.escape(self.description)}</dc:description>')
+
+        manifest = [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>',
+            '<item id="style_nav" href="style/nav.css" media-type="text/css"/>',
+            f'<item id="chapter_index" href="{CHAPTER_INDEX_FILE}" media-type="application/json"/>',
+        ]
+        if cover:
+            _, media_type, extension = cover
+            metadata.append('<meta name="cover" content="cover-img"/>')
+            manifest.append(f'<item id="cover-img" href="cover.{extension}" media-type="{media_type}" properties="cover-image"/>')
+
+        spine = ['<itemref idref="nav"/>']
+        for idx, (file_name, _) in enumerate(self.toc, 1):
+            manifest.append(f'<item id="chapter_{idx}" href="{file_name}" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="chapter_{idx}"/>')
+
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" unique-identifier="id" version="3.0">\n'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n' + '\n'.join(metadata) + '\n</metadata>\n'
+            '<manifest>\n' + '\n'.join(manifest) + '\n</manifest>\n'
+            '<spine toc="ncx">\n' + '\n'.join(spine) + '\n</spine>\n'
+            '</package>\n'
+        )
+
+    def _ncx(self):
+        nav_points = [
+            f'<navPoint id="chapter_{idx}"><navLabel><text>{html.escape(title)}</text></navLabel>'
+            f'<content src="{file_name}"/></navPoint>'
+            for idx, (file_name, title) in enumerate(self.toc, 1)
+        ]
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">\n'
+            f'<head><meta name="dtb:uid" content="{html.escape(self.identifier)}"/></head>\n'
+            f'<docTitle><text>{html.escape(self.title)}</text></docTitle>\n'
+            '<navMap>\n' + '\n'.join(nav_points) + '\n</navMap>\n'
+            '</ncx>\n'
+        )
+
+    def _nav(self):
+        items = [
+            f'<li><a href="{file_name}">{html.escape(title)}</a></li>'
+            for file_name, title in self.toc
+        ]
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" '
+            f'lang="{self.language}" xml:lang="{self.language}">\n'
+            f'<head><title>{html.escape(self.title)}</title></head>\n'
+            '<body><nav epub:type="toc" id="id" role="doc-toc">\n'
+            f'<h2>{html.escape(self.title)}</h2>\n'
+            '<ol>\n' + '\n'.join(items) + '\n</ol>\n'
+            '</nav></body>\n</html>\n'
+        )
+
+    def close(self):
+        """Write cover, package document, NCX and nav, then finalize the file"""
+        cover = load_cover(self.cover_image)
+        cover_file = None
+        if cover:
+            cover_file = f'cover.{cover[2]}'
+            self.zip.writestr(f'EPUB/{cover_file}', cover[0])
+        self.zip.writestr(f'EPUB/{CHAPTER_INDEX_FILE}', build_chapter_index(
+            self.identifier, self.title, self.author, self.description, self.language,
+            self.novel_url, cover_file, self.chapter_index
+        ))
+        self.zip.writestr('EPUB/content.opf', self._package_document(cover))
+        self.zip.writestr('EPUB/toc.ncx', self._ncx())
+        self.zip.writestr('EPUB/nav.xhtml', self._nav())
+        self.zip.close()
+        os.replace(self.temp_filename, self.output_filename)
+
+    def abort(self):
+        """Discard the partially written file"""
+        self.zip.close()
+        if os.path.exists(self.temp_filename):
+            os.remove(self.temp_filename)
 
 
 class EpubCreator:
     """Class for creating EPUB files from novel data"""
 
     def __init__(self, novel_title, novel_author, novel_id,
-                 novel_description=None, cover_image=None):
+                 novel_description=None, cover_image=None, novel_url=None):
         """
         Initialize EPUB creator
 
@@ -21,30 +435,36 @@ class EpubCreator:
             novel_author: Author of the novel
             novel_id: ID of the novel
             novel_description: Description of the novel (optional)
-            cover_image: Cover image as bytes (optional)
+            cover_image: Cover image as bytes or a Future of bytes (optional)
+            novel_url: URL of the novel page, needed to update the EPUB later (optional)
         """
         self.novel_title = novel_title
         self.novel_author = novel_author
         self.novel_id = novel_id
         self.novel_description = novel_description
         self.cover_image = cover_image
+        self.novel_url = novel_url
 
-    def create_epub(self, chapters, output_filename=None):
+    def default_filename(self):
+        """Default EPUB filename, built from the novel title"""
+        safe_title = re.sub(r'[^\w\s-]', '', self.novel_title)
+        safe_title = re.sub(r'[-\s]+', '_', safe_title)
+        return f"{safe_title}.epub"
+
+    def create_epub(self, chapters, output_filename=None, metrics=None):
         """
         Create EPUB file from chapter list
 
         Args:
-            chapters: List of chapters with content
+            chapters: List of Chapter records (or dicts) with content
             output_filename: Output filename (optional)
+            metrics: CrawlMetrics recording the EPUB write time (optional)
 
         Returns:
             Path to created EPUB file
         """
         if not output_filename:
-            # Create filename from novel title
-            safe_title = re.sub(r'[^\w\s-]', '', self.novel_title)
-            safe_title = re.sub(r'[-\s]+', '_', safe_title)
-            output_filename = f"{safe_title}.epub"
+            output_filename = self.default_filename()
 
         print(f"\nĐang tạo file EPUB: {output_filename}")
 
@@ -52,7 +472,8 @@ class EpubCreator:
         book = epub.EpubBook()
 
         # Metadata
-        book.set_identifier(f'novel_{self.novel_id}_{int(time.time())}')
+        identifier = f'novel_{self.novel_id}_{int(time.time())}'
+        book.set_identifier(identifier)
         book.set_title(self.novel_title)
         book.set_language('vi')
         book.add_author(self.novel_author)
@@ -61,8 +482,11 @@ class EpubCreator:
             book.add_metadata('DC', 'description', self.novel_description)
 
         # Add cover image if available
-        if self.cover_image:
-            book.set_cover('cover.jpg', self.cover_image)
+        cover = load_cover(self.cover_image)
+        cover_file = None
+        if cover:
+            cover_file = f'cover.{cover[2]}'
+            book.set_cover(cover_file, cover[0])
 
         # CSS style
         nav_css = epub.EpubItem(
@@ -75,20 +499,23 @@ class EpubCreator:
 
         # Create chapters
         epub_chapters = []
+        chapter_index = []
         spine = ['nav']
 
         for idx, chapter in enumerate(chapters, 1):
+            chapter = Chapter.coerce(chapter)
+
             # Create chapter
             epub_chapter = epub.EpubHtml(
-                title=chapter['title'],
+                title=chapter.title,
                 file_name=f'chapter_{idx}.xhtml',
                 lang='vi'
             )
 
             # Chapter content
             chapter_content = f'''
-            <h1>{chapter['title']}</h1>
-            {chapter['content']}
+            <h1>{chapter.title}</h1>
+            {chapter.content}
             '''
 
             epub_chapter.set_content(chapter_content)
@@ -97,6 +524,23 @@ class EpubCreator:
             book.add_item(epub_chapter)
             epub_chapters.append(epub_chapter)
             spine.append(epub_chapter)
+            chapter_index.append({
+                'file': epub_chapter.file_name,
+                'title': chapter.title,
+                'url': chapter.url,
+                'slug': chapter.slug
+            })
+
+        # Chapter index, used to append new chapters later without re-crawling
+        book.add_item(epub.EpubItem(
+            uid="chapter_index",
+            file_name=CHAPTER_INDEX_FILE,
+            media_type="application/json",
+            content=build_chapter_index(
+                identifier, self.novel_title, self.novel_author, self.novel_description, 'vi',
+                self.novel_url, cover_file, chapter_index
+            )
+        ))
 
         # Add navigation
         book.toc = tuple(epub_chapters)
@@ -107,9 +551,114 @@ class EpubCreator:
         book.spine = spine
 
         # Write file
-        epub.write_epub(output_filename, book)
+        with metrics.stage('epub_write') if metrics else nullcontext():
+            epub.write_epub(output_filename, book)
 
         file_size = os.path.getsize(output_filename) / (1024 * 1024)
         print(f"✓ Đã tạo file EPUB: {output_filename} ({file_size:.2f} MB)")
 
         return output_filename
+
+    def create_epub_streaming(self, chapters, output_filename=None, metrics=None):
+        """
+        Create EPUB file from a stream of chapters
+
+        Unlike create_epub, chapters are written into the file as they are
+        produced (e.g. by BaseNovelSource.iter_crawl_chapters) and are not
+        kept in memory, so peak memory does not depend on the novel length.
+
+        Args:
+            chapters: Iterable of Chapter records (or dicts) with content
+            output_filename: Output filename (optional)
+            metrics: CrawlMetrics recording the EPUB write time (optional)
+
+        Returns:
+            Path to created EPUB file
+        """
+        if not output_filename:
+            output_filename = self.default_filename()
+
+        print(f"\nĐang tạo file EPUB: {output_filename}")
+
+        writer = StreamingEpubWriter(
+            output_filename,
+            identifier=f'novel_{self.novel_id}_{int(time.time())}',
+            title=self.novel_title,
+            author=self.novel_author,
+            description=self.novel_description,
+            cover_image=self.cover_image,
+            novel_url=self.novel_url
+        )
+        write_stage = (lambda: metrics.stage('epub_write')) if metrics else nullcontext
+        try:
+            for chapter in chapters:
+                chapter = Chapter.coerce(chapter)
+                with write_stage():
+                    writer.add_chapter(chapter.title, chapter.content, chapter.url, chapter.slug)
+        except BaseException:
+            writer.abort()
+            raise
+        with write_stage():
+            writer.close()
+
+        file_size = os.path.getsize(output_filename) / (1024 * 1024)
+        print(f"✓ Đã tạo file EPUB: {output_filename} ({file_size:.2f} MB)")
+
+        return output_filename
+
+
+def update_epub(epub_filename, chapters, metrics=None):
+    """
+    Append new chapters to an EPUB created by EpubCreator
+
+    The existing chapter files are kept as they are in the archive, without
+    being decompressed or compressed again; only the new chapters are
+    rendered. The package document, NCX, nav and chapter index are rebuilt
+    so that they include the new chapters.
+
+    Args:
+        epub_filename: EPUB to update in place
+        chapters: Iterable of new Chapter records (or dicts) with content
+        metrics: CrawlMetrics recording the EPUB write time (optional)
+
+    Returns:
+        Number of chapters added
+    """
+    index = read_chapter_index(epub_filename)
+    if index is None:
+        raise ValueError("File EPUB không có danh sách chương (được tạo bởi phiên bản cũ?)")
+
+    print(f"\nĐang cập nhật file EPUB: {epub_filename}")
+
+    write_stage = (lambda: metrics.stage('epub_write')) if metrics else nullcontext
+
+    with zipfile.ZipFile(epub_filename) as book:
+        cover_image = book.read(f"EPUB/{index['cover']}") if index.get('cover') else None
+    writer = StreamingEpubWriter(
+        epub_filename,
+        identifier=index['identifier'],
+        title=index['title'],
+        author=index['author'],
+        description=index.get('description'),
+        cover_image=cover_image,
+        language=index.get('language') or 'vi',
+        novel_url=index.get('novel_url'),
+        existing_chapters=index['chapters']
+    )
+    existing = len(writer.toc)
+    try:
+        for chapter in chapters:
+            chapter = Chapter.coerce(chapter)
+            with write_stage():
+                writer.add_chapter(chapter.title, chapter.content, chapter.url, chapter.slug)
+    except BaseException:
+        writer.abort()
+        raise
+    with write_stage():
+        writer.close()
+
+    added = len(writer.toc) - existing
+    file_size = os.path.getsize(epub_filename) / (1024 * 1024)
+    print(f"✓ Đã thêm {added} chương vào {epub_filename} ({file_size:.2f} MB)")
+
+    return added
@@ -1,12 +1,153 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from epub_creator import EpubCreator
-from sources import SOURCES, print_sources, get_source_by_key
-from config import DEFAULT_CHAPTER_LIST_DELAY
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
+from epub_creator import EpubCreator, read_chapter_index, update_epub
+from sources import SOURCES, print_sources, get_source_by_key, get_source_for_url
+from sources.checkpoint import CheckpointJournal, checkpoint_path
+from sources.metrics import CrawlMetrics
+from sources.progress import ProgressBar, JsonLinesReporter, no_progress
+from config import DEFAULT_CHAPTER_LIST_DELAY, DEFAULT_CRAWL_WORKERS, DEFAULT_PARSE_PROCESSES
 
-def main():
+
+def crawl_to_epub(source, novel_info, chapters, journal, output_file=None, output_dir=None,
+                  workers=None, parse_processes=None, metrics=None, progress=None):
+    """
+    Crawl chapters straight into an EPUB file
+
+    Args:
+        source: Source instance
+        novel_info: Dict from parse_novel_url
+        chapters: Chapters to crawl (already filtered to the wanted range)
+        journal: CheckpointJournal of the novel (removed once the EPUB is written)
+        output_file: Output filename (optional)
+        output_dir: Directory for the default filename when output_file is not given (optional)
+        workers: Number of concurrent downloads (optional)
+        parse_processes: Number of parser processes (optional)
+        metrics: CrawlMetrics to record into (optional, a new one is printed otherwise)
+        progress: Callable receiving crawl progress events (optional, progress bar by default)
+
+    Returns:
+        Path to created EPUB file
+    """
+    # The cover is downloaded while the chapters are crawled
+    cover_executor = ThreadPoolExecutor(max_workers=1)
+    epub_creator = EpubCreator(
+        novel_title=novel_info['novel_title'],
+        novel_author=novel_info['novel_author'],
+        novel_id=novel_info['novel_id'],
+        novel_description=novel_info['novel_description'],
+        cover_image=cover_executor.submit(source.fetch_cover, novel_info),
+        novel_url=novel_info.get('novel_url')
+    )
+    cover_executor.shutdown(wait=False)
+    if not output_file and output_dir:
+        output_file = os.path.join(output_dir, epub_creator.default_filename())
+
+    own_metrics = metrics is None
+    if own_metrics:
+        metrics = CrawlMetrics()
+
+    # Chapters are written into the EPUB as they are crawled.
+    # Uses DEFAULT_CRAWL_WORKERS, DEFAULT_RATE_LIMIT_PER_HOST and DEFAULT_MAX_RETRIES from config
+    with journal:
+        output_file = epub_creator.create_epub_streaming(
+            source.iter_crawl_chapters(chapters, workers=workers, journal=journal,
+                                       parse_processes=parse_processes, metrics=metrics,
+                                       progress=progress),
+            output_file,
+            metrics=metrics
+        )
+    journal.remove()
+    if own_metrics:
+        metrics.print_summary()
+    return output_file
+
+
+def select_new_chapters(index, chapters):
+    """
+    Chapters of the current chapter list that are not in the EPUB yet
+
+    Chapters after the last one already in the book are new. If that
+    chapter is no longer listed, fall back to every chapter whose URL is
+    not in the book.
+
+    Args:
+        index: Chapter index read from the EPUB
+        chapters: Current chapter list from get_chapter_list
+
+    Returns:
+        List of new chapters
+    """
+    known_urls = {entry['url'] for entry in index['chapters']}
+    if index['chapters']:
+        last_url = index['chapters'][-1]['url']
+        for position in range(len(chapters) - 1, -1, -1):
+            if chapters[position].url == last_url:
+                return [chapter for chapter in chapters[position + 1:] if chapter.url not in known_urls]
+    return [chapter for chapter in chapters if chapter.url not in known_urls]
+
+
+def update_existing_epub(epub_path, sources, workers=None, parse_processes=None, metrics=None,
+                         progress=None, resume=True):
+    """
+    Append the chapters published since an EPUB was created
+
+    Args:
+        epub_path: EPUB created by this tool
+        sources: Dict of source class -> instance, shared across novels
+        workers: Number of concurrent downloads (optional)
+        parse_processes: Number of parser processes (optional)
+        metrics: CrawlMetrics to record into (optional)
+        progress: Callable receiving crawl progress events (optional, progress bar by default)
+        resume: Reuse the chapters saved by an interrupted update (False = start over)
+
+    Returns:
+        True on success
+    """
+    index = read_chapter_index(epub_path)
+    if index is None or not index.get('novel_url'):
+        print(f"✗ {epub_path} không có danh sách chương, không thể cập nhật (hãy tạo lại file)")
+        return False
+
+    novel_url = index['novel_url']
+    source_class = get_source_for_url(novel_url)
+    if not source_class:
+        print(f"✗ Không có nguồn nào hỗ trợ: {novel_url}")
+        return False
+    if source_class not in sources:
+        sources[source_class] = source_class()
+    source = sources[source_class]
+
+    novel_info = source.parse_novel_url(novel_url)
+    chapters = source.get_chapter_list(novel_info, delay=DEFAULT_CHAPTER_LIST_DELAY)
+    new_chapters = select_new_chapters(index, chapters)
+    if not new_chapters:
+        print(f"\n✓ Không có chương mới ({len(index['chapters'])} chương)")
+        return True
+
+    print(f"\n✓ Có {len(new_chapters)} chương mới")
+
+    journal = CheckpointJournal(checkpoint_path(source.name, novel_info['novel_slug']))
+    if len(journal) and not resume:
+        journal.reset()
+    with journal:
+        update_epub(
+            epub_path,
+            source.iter_crawl_chapters(new_chapters, workers=workers, journal=journal,
+                                       parse_processes=parse_processes, metrics=metrics,
+                                       progress=progress),
+            metrics=metrics
+        )
+    journal.remove()
+    return True
+
+
+def interactive_main():
     print("=" * 60)
     print("NOVEL SCRAPER - Multi Source")
     print("=" * 60)
@@ -86,17 +227,15 @@ def main():
             print("Đã hủy.")
             return
 
-        # Uses DEFAULT_DELAY_BETWEEN_REQUESTS and DEFAULT_MAX_RETRIES from config
-        chapters_with_content = source.crawl_all_chapters(chapters)
+        # Finished chapters are journaled so an interrupted crawl can be resumed
+        journal = CheckpointJournal(checkpoint_path(source.name, novel_info['novel_slug']))
+        if len(journal):
+            print(f"\n✓ Tìm thấy {len(journal)} chương đã tải ở lần chạy trước.")
+            resume = input("Tiếp tục từ lần trước? (y/n): ").strip().lower()
+            if resume != 'y':
+                journal.reset()
 
-        epub_creator = EpubCreator(
-            novel_title=novel_info['novel_title'],
-            novel_author=novel_info['novel_author'],
-            novel_id=novel_info['novel_id'],
-            novel_description=novel_info['novel_description'],
-            cover_image=novel_info['cover_image']
-        )
-        output_file = epub_creator.create_epub(chapters_with_content)
+        output_file = crawl_to_epub(source, novel_info, chapters, journal)
 
         print("\n" + "=" * 60)
         print("✓ HOÀN THÀNH!")
@@ -104,12 +243,210 @@ def main():
         print("=" * 60)
 
     except KeyboardInterrupt:
-        print("\n\n✗ Đã dừng bởi người dùng.")
+        print("\n\n✗ Đã dừng bởi người dùng. Chạy lại để tiếp tục từ các chương đã tải.")
     except Exception as e:
         print(f"\n✗ Lỗi: {e}")
         import traceback
         traceback.print_exc()
 
 
+def read_batch_file(path):
+    """Read novel URLs from a batch file (one per line, # starts a comment)"""
+    urls = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                urls.append(line)
+    return urls
+
+
+def run_batch(args):
+    """
+    Crawl every novel given on the command line without prompting
+
+    Novels are crawled one after the other (the chapters of each one
+    concurrently). One source instance is created per source class and
+    reused for all novels, so connection pools (and the shared per-host
+    rate limiter) are shared across the whole run.
+
+    Returns:
+        Process exit code
+    """
+    urls = list(args.urls)
+    if args.batch:
+        urls.extend(read_batch_file(args.batch))
+
+    sources = {}
+    failed = []
+    metrics = CrawlMetrics()
+    progress = make_progress(args.progress)
+
+    for epub_path in args.update:
+        print("\n" + "=" * 60)
+        print(f"Cập nhật: {epub_path}")
+        print("=" * 60)
+        try:
+            if not update_existing_epub(epub_path, sources, workers=args.workers,
+                                        parse_processes=args.parse_processes, metrics=metrics,
+                                        progress=progress, resume=args.resume):
+                failed.append(epub_path)
+        except KeyboardInterrupt:
+            print("\n\n✗ Đã dừng bởi người dùng. Chạy lại để tiếp tục từ các chương đã tải.")
+            return 130
+        except Exception as e:
+            print(f"\n✗ Lỗi: {e}")
+            failed.append(epub_path)
+
+    if args.output and len(urls) > 1:
+        print("✗ --output chỉ dùng được với một truyện, hãy dùng --output-dir")
+        return 2
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    for novel_idx, novel_url in enumerate(urls, 1):
+        print("\n" + "=" * 60)
+        print(f"[{novel_idx}/{len(urls)}] {novel_url}")
+        print("=" * 60)
+
+        source_class = get_source_for_url(novel_url)
+        if not source_class:
+            print(f"✗ Không có nguồn nào hỗ trợ: {novel_url}")
+            failed.append(novel_url)
+            continue
+        if source_class not in sources:
+            sources[source_class] = source_class()
+        source = sources[source_class]
+
+        try:
+            novel_info = source.parse_novel_url(novel_url)
+            chapters = source.get_chapter_list(novel_info, delay=DEFAULT_CHAPTER_LIST_DELAY)
+            if not chapters:
+                print("\n✗ Không tìm thấy chương nào!")
+                failed.append(novel_url)
+                continue
+
+            start_chapter = max(args.start, 1)
+            end_chapter = min(args.end or len(chapters), len(chapters))
+            if start_chapter > end_chapter:
+                print(f"✗ Phạm vi chương không hợp lệ (truyện có {len(chapters)} chương)")
+                failed.append(novel_url)
+                continue
+            crawl_source = source
+            if args.mirrors or args.mirror:
+                from sources.mirror import MirroredSource, find_mirrors
+
+                candidates = []
+                if args.mirrors:
+                    for entry in SOURCES.values():
+                        mirror_class = entry.load()
+                        if mirror_class is not source_class:
+                            candidates.append(sources.setdefault(mirror_class, mirror_class()))
+                mirrors = find_mirrors(source, novel_info, chapters, candidates, args.mirror)
+                if len(mirrors) > 1:
+                    crawl_source = MirroredSource(mirrors)
+
+            chapters = chapters[start_chapter-1:end_chapter]
+            print(f"\n✓ Chương {start_chapter} đến {end_chapter} ({len(chapters)} chương)")
+
+            journal = CheckpointJournal(checkpoint_path(source.name, novel_info['novel_slug']))
+            if len(journal) and not args.resume:
+                journal.reset()
+
+            try:
+                output_file = crawl_to_epub(crawl_source, novel_info, chapters, journal,
+                                            args.output, args.output_dir,
+                                            workers=args.workers, parse_processes=args.parse_processes,
+                                            metrics=metrics, progress=progress)
+            finally:
+                if crawl_source is not source:
+                    crawl_source.close()
+                    print("Bản sao:")
+                    print(crawl_source.describe())
+            print(f"✓ File đã được lưu: {output_file}")
+
+        except KeyboardInterrupt:
+            print("\n\n✗ Đã dừng bởi người dùng. Chạy lại để tiếp tục từ các chương đã tải.")
+            return 130
+        except Exception as e:
+            print(f"\n✗ Lỗi: {e}")
+            failed.append(novel_url)
+
+    print("\n" + "=" * 60)
+    total = len(urls) + len(args.update)
+    print(f"✓ Hoàn thành {total - len(failed)}/{total} truyện")
+    for item in failed:
+        print(f"  ✗ {item}")
+    print("=" * 60)
+
+    metrics.print_summary()
+    if args.metrics:
+        metrics.export(args.metrics)
+        print(f"✓ Đã ghi thống kê: {args.metrics}")
+
+    return 1 if failed else 0
+
+
+def make_progress(mode):
+    """Progress callable for the --progress option"""
+    if mode == 'json':
+        return JsonLinesReporter()
+    if mode == 'none':
+        return no_progress
+    return ProgressBar()
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Tải truyện từ nhiều nguồn và chuyển sang EPUB. "
+                    "Không truyền URL nào để dùng chế độ hỏi-đáp."
+    )
+    parser.add_argument('urls', nargs='*', metavar='URL',
+                        help="Link truyện (nguồn được nhận diện theo tên miền)")
+    parser.add_argument('-b', '--batch', metavar='FILE',
+                        help="File chứa danh sách link truyện, mỗi dòng một link")
+    parser.add_argument('-u', '--update', metavar='EPUB', action='append', default=[],
+                        help="Tải thêm các chương mới vào file EPUB đã tạo trước đó (dùng nhiều lần được)")
+    parser.add_argument('--from', dest='start', type=int, default=1, metavar='N',
+                        help="Tải từ chương N (mặc định: 1)")
+    parser.add_argument('--to', dest='end', type=int, default=None, metavar='M',
+                        help="Tải đến chương M (mặc định: chương cuối)")
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help="File EPUB đầu ra (chỉ khi tải một truyện)")
+    parser.add_argument('-d', '--output-dir', metavar='DIR',
+                        help="Thư mục chứa các file EPUB")
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_CRAWL_WORKERS,
+                        help=f"Số chương tải song song tối đa, tự điều chỉnh theo phản hồi của host "
+                             f"(mặc định: {DEFAULT_CRAWL_WORKERS})")
+    parser.add_argument('--parse-processes', type=int, default=DEFAULT_PARSE_PROCESSES,
+                        help=f"Số process phân tích HTML (mặc định: {DEFAULT_PARSE_PROCESSES})")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="Ghi thống kê thời gian tải/phân tích/ghi EPUB ra file "
+                             "(JSON, hoặc định dạng Prometheus nếu đuôi .prom)")
+    parser.add_argument('--progress', choices=['bar', 'json', 'none'], default='bar',
+                        help="Cách hiển thị tiến độ: thanh tiến độ, mỗi sự kiện một dòng JSON "
+                             "(ghi ra stderr, dùng cho log) hoặc không hiển thị (mặc định: bar)")
+    parser.add_argument('--mirrors', action='store_true',
+                        help="Tìm truyện trên các nguồn khác và tải từ tất cả: chương được lấy từ "
+                             "nguồn nhanh nhất, tự chuyển nguồn khi một nguồn lỗi hoặc chậm")
+    parser.add_argument('--mirror', metavar='URL', action='append', default=[],
+                        help="Link cùng truyện trên nguồn khác, khi tên truyện ở đó khác "
+                             "(dùng nhiều lần được)")
+    parser.add_argument('--no-resume', dest='resume', action='store_false',
+                        help="Bỏ qua các chương đã tải ở lần chạy trước")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    if not args.urls and not args.batch and not args.update:
+        interactive_main()
+        return 0
+
+    return run_batch(args)
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -3,35 +3,119 @@
 
 """
 Sources package - Registry for all novel sources
+
+The registry only knows each source by the host it handles and the
+import path of its class; the source module (and with it requests and
+bs4) is imported when the source is first used, so listing sources or
+printing --help stays fast however many sources there are.
+
+Built-in sources are listed in BUILTIN_SOURCES. Other installed packages
+can add sources through the 'metruyenchu.sources' entry point group, the
+entry point name being the host:
+
+    [project.entry-points."metruyenchu.sources"]
+    "example.com" = "my_package.example:ExampleSource"
 """
 
-from sources.metruyenchu_com_vn import MetruyenchuComVnSource
-from sources.metruyenhot_me import MetruyenhotMeSource
+import importlib
+from urllib.parse import urlparse
+
+ENTRY_POINT_GROUP = 'metruyenchu.sources'
+
+
+class SourceEntry:
+    """A registered source; its class is imported on first use"""
+
+    def __init__(self, name, target, description=None, hosts=None):
+        """
+        Args:
+            name: Host of the source, e.g. 'metruyenchu.com.vn'
+            target: Import path of the source class, 'package.module:ClassName'
+            description: Name shown in the menu (defaults to name)
+            hosts: Hosts handled by the source (defaults to [name]);
+                subdomains of these hosts match too
+        """
+        self.name = name
+        self.target = target
+        self.description = description or name
+        self.hosts = tuple(hosts) if hosts else (name,)
+        self._class = None
+
+    def load(self):
+        """Import and return the source class"""
+        if self._class is None:
+            module_name, _, class_name = self.target.partition(':')
+            self._class = getattr(importlib.import_module(module_name), class_name)
+        return self._class
+
+    def handles(self, host):
+        """Whether the source handles a (lowercase) host"""
+        return any(host == name or host.endswith('.' + name) for name in self.hosts)
+
+    def __repr__(self):
+        return f"<SourceEntry {self.name} -> {self.target}>"
+
 
-# Registry of all available sources
-SOURCES = {
-    '1': {
-        'name': 'metruyenchu.com.vn',
-        'class': MetruyenchuComVnSource,
-        'description': 'Mê Truyện Chữ'
-    },
-    '2': {
-        'name': 'metruyenhot.me',
-        'class': MetruyenhotMeSource,
-        'description': 'Mê Truyện Hot'
-    }
-}
+BUILTIN_SOURCES = [
+    SourceEntry('metruyenchu.com.vn', 'sources.metruyenchu_com_vn:MetruyenchuComVnSource', 'Mê Truyện Chữ'),
+    SourceEntry('metruyenhot.me', 'sources.metruyenhot_me:MetruyenhotMeSource', 'Mê Truyện Hot'),
+]
+
+
+def discover_sources():
+    """
+    Built-in sources followed by the ones installed through entry points
+
+    Returns:
+        Dict of menu key ('1', '2', ...) to SourceEntry
+    """
+    entries = list(BUILTIN_SOURCES)
+    known = {entry.name for entry in entries}
+    try:
+        from importlib.metadata import entry_points
+        plugins = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        print(f"✗ Không đọc được danh sách nguồn cài thêm ({e})")
+        plugins = ()
+    for plugin in sorted(plugins, key=lambda plugin: plugin.name):
+        if plugin.name not in known:
+            known.add(plugin.name)
+            entries.append(SourceEntry(plugin.name, plugin.value))
+    return {str(key): entry for key, entry in enumerate(entries, 1)}
+
+
+# Registry of all available sources, by menu key
+SOURCES = discover_sources()
 
 
 def get_source_by_key(key):
     """Get source class by registry key"""
     if key in SOURCES:
-        return SOURCES[key]['class']
+        return SOURCES[key].load()
+    return None
+
+
+def get_source_for_url(url):
+    """
+    Get source class by the host of a novel URL
+
+    Only the matching source is imported.
+
+    Args:
+        url: Novel URL
+
+    Returns:
+        Source class, or None if no source handles the host
+    """
+    host = urlparse(url).netloc.lower().split(':')[0]
+    for entry in SOURCES.values():
+        if entry.handles(host):
+            return entry.load()
     return None
 
 
 def print_sources():
     """Print available sources for user selection"""
     print("\nChọn nguồn truyện:")
-    for key, source in SOURCES.items():
-        print(f"  {key}. {source['name']} - {source['description']}")
+    for key, entry in SOURCES.items():
+        print(f"  {key}. {entry.name} - {entry.description}")
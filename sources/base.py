@@ -5,9 +5,39 @@
 Base class for all novel sources
 """
 
+import time
+import asyncio
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from config import DEFAULT_MAX_RETRIES, DEFAULT_DELAY_BETWEEN_REQUESTS
+from config import (
+    DEFAULT_MAX_RETRIES, DEFAULT_DELAY_BETWEEN_REQUESTS, DEFAULT_CRAWL_WORKERS,
+    DEFAULT_PARSE_PROCESSES, CHAPTER_CACHE_ENABLED, HTTP_CACHE_ENABLED,
+    DEFAULT_TIMEOUT, PROBE_MAX_BYTES, PROBE_CHUNK_SIZE, HEDGE_ENABLED
+)
+from sources.rate_limiter import default_rate_limiter, response_info, backoff_delay, ConcurrencyLimiter
+from sources.http_client import AsyncHttpClient
+from sources.chapter_cache import get_default_cache
+from sources.http_cache import CachingHTTPAdapter, get_default_http_cache
+from sources.metrics import CrawlMetrics, stage, requests_hook, record_hedge
+from sources.hedge import LatencyTracker, HedgeSkipped, race, arace
+from sources.progress import make_event, get_progress, no_progress
+from sources.chapter import Chapter
+
+
+# One parser instance per source class in each worker process
+_worker_sources = {}
+
+
+def parse_chapter_in_worker(source_class, page_html):
+    """Run source_class._parse_chapter_page in a parser worker process"""
+    source = _worker_sources.get(source_class)
+    if source is None:
+        source = _worker_sources[source_class] = source_class()
+    return source._parse_chapter_page(page_html)
 
 
 class BaseNovelSource(ABC):
@@ -17,6 +47,40 @@ class BaseNovelSource(ABC):
     name = "base"
     base_url = ""
 
+    # Content of a chapter that still fails after every retry
+    failure_placeholder = "<p>Loi khi tai chuong sau {attempts} lan thu: {error}</p>"
+
+    # URLs matching this regex bypass the HTTP cache. Chapter pages are
+    # fetched once and kept in the chapter cache instead.
+    http_cache_skip = None
+
+    _async_client = None
+
+    @property
+    def async_client(self):
+        """AsyncHttpClient used by the async API (created on first use)"""
+        if self._async_client is None:
+            self._async_client = AsyncHttpClient()
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, client):
+        # Lets several sources share one client (and connection pool)
+        self._async_client = client
+
+    @property
+    def http_cache(self):
+        """Shared HttpCache, or None when HTTP_CACHE_ENABLED is off"""
+        return get_default_http_cache() if HTTP_CACHE_ENABLED else None
+
+    def _prepare_session(self, session):
+        """Revalidate the session's GETs against the HTTP cache and report responses to metrics"""
+        if HTTP_CACHE_ENABLED:
+            adapter = CachingHTTPAdapter(skip=self.http_cache_skip)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        session.hooks['response'].append(requests_hook)
+
     @abstractmethod
     def parse_novel_url(self, url):
         """
@@ -33,7 +97,8 @@ class BaseNovelSource(ABC):
                 'novel_title': str,
                 'novel_author': str,
                 'novel_description': str,
-                'cover_image': bytes or None,
+                'novel_url': str,
+                'cover_url': str or None,
                 'max_pages': int,
                 'total_chapters': int
             }
@@ -50,7 +115,7 @@ class BaseNovelSource(ABC):
             delay: Delay time between requests (seconds)
 
         Returns:
-            List of dicts containing chapter information
+            Sequence of Chapter records without content (usually a ChapterList)
         """
         pass
 
@@ -67,51 +132,733 @@ class BaseNovelSource(ABC):
         """
         pass
 
-    def crawl_all_chapters(self, chapters, delay=None, max_retries=None):
+    def fetch_cover(self, novel_info):
         """
-        Crawl content of all chapters
+        Download the cover image of a novel
+
+        Covers are fetched when the EPUB is built (usually in parallel with
+        the chapter crawl), not by parse_novel_url.
 
         Args:
-            chapters: List of chapters
-            delay: Delay time between requests
+            novel_info: Dict from parse_novel_url
+
+        Returns:
+            Image bytes, or None if the novel has no cover or it failed
+        """
+        cover_url = novel_info.get('cover_url')
+        if not cover_url:
+            return None
+        try:
+            response = self.session.get(cover_url, timeout=DEFAULT_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            print(f"✗ Lỗi tải ảnh bìa ({e})")
+            return None
+
+    def probe(self, url):
+        """
+        Cheap check of the current chapter count of a novel
+
+        Meant for watching many novels for new chapters. This default builds
+        the whole chapter list; sources override it with something that
+        only reads what is needed (see _read_until).
+
+        Args:
+            url: Full URL of the novel page
+
+        Returns:
+            dict: {
+                'total_chapters': int,
+                'latest_slug': str or None
+            }
+        """
+        novel_info = self.parse_novel_url(url)
+        chapters = self.get_chapter_list(novel_info)
+        return {
+            'total_chapters': len(chapters),
+            'latest_slug': chapters[-1].slug if chapters else None
+        }
+
+    def novel_url_for_slug(self, novel_slug):
+        """
+        URL of a novel page on this source from its slug (used to find mirrors)
+
+        Args:
+            novel_slug: Slug of the novel, e.g. 'thanh-van-kiem-dao'
+
+        Returns:
+            Full URL of the novel page
+        """
+        return f"{self.base_url}/{novel_slug}"
+
+    def _read_until(self, url, extract, max_bytes=None):
+        """
+        Stream a page from self.session until extract() finds what it needs
+
+        The connection is dropped as soon as extract returns a value, so
+        only the beginning of a large page is downloaded.
+
+        Args:
+            url: URL to fetch
+            extract: Function called with the text read so far, returns None
+                     while more text is needed. The text may end anywhere, even
+                     inside a number, so a pattern must not match up to its end.
+            max_bytes: Stop reading after this many bytes (defaults to PROBE_MAX_BYTES)
+
+        Returns:
+            Value returned by extract, or None if it never matched
+        """
+        max_bytes = max_bytes or PROBE_MAX_BYTES
+        received = b''
+        with self.session.get(url, timeout=DEFAULT_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            # requests falls back to ISO-8859-1 for text/* without a charset
+            charset_given = 'charset' in response.headers.get('Content-Type', '')
+            encoding = response.encoding if charset_given and response.encoding else 'utf-8'
+            for chunk in response.iter_content(PROBE_CHUNK_SIZE):
+                received += chunk
+                # A multi-byte character may be cut at the end of the chunk
+                result = extract(received.decode(encoding, errors='ignore'))
+                if result is not None:
+                    return result
+                if len(received) >= max_bytes:
+                    break
+        return None
+
+    # Async API
+    #
+    # Sources override these with native async implementations. The defaults
+    # run the sync methods in a worker thread so that every source can be
+    # driven from an event loop.
+
+    async def aparse_novel_url(self, url):
+        """Async version of parse_novel_url"""
+        return await asyncio.to_thread(self.parse_novel_url, url)
+
+    async def aget_chapter_list(self, novel_info, delay=0.5):
+        """Async version of get_chapter_list"""
+        return await asyncio.to_thread(self.get_chapter_list, novel_info, delay)
+
+    async def aget_chapter_content(self, chapter_url):
+        """Async version of get_chapter_content"""
+        return await asyncio.to_thread(self.get_chapter_content, chapter_url)
+
+    async def afetch_cover(self, novel_info):
+        """Async version of fetch_cover"""
+        cover_url = novel_info.get('cover_url')
+        if not cover_url:
+            return None
+        try:
+            response = await self.async_client.get(cover_url, cache=self.http_cache)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            print(f"✗ Lỗi tải ảnh bìa ({e})")
+            return None
+
+    async def aprobe(self, url):
+        """Async version of probe"""
+        return await asyncio.to_thread(self.probe, url)
+
+    # Chapter pipeline
+    #
+    # Crawling a chapter is split into a network stage (_fetch_chapter_page,
+    # raw page) and a CPU stage (_parse_chapter_page, title and cleaned
+    # content), so that parsing can run in a process pool. The defaults do
+    # all the work in the network stage through get_chapter_content.
+    #
+    # The process pool and the hedge threads belong to one crawl call and
+    # are passed down as `parse_pool` and `hedge_pool`; the rate limiter is
+    # acquired around the download only.
+
+    def _fetch_chapter_page(self, chapter_url):
+        """
+        Download a chapter page (network stage)
+
+        Args:
+            chapter_url: URL of the chapter
+
+        Returns:
+            Raw page handed to _parse_chapter_page
+        """
+        return self.get_chapter_content(chapter_url)
+
+    async def _afetch_chapter_page(self, chapter_url):
+        """Async version of _fetch_chapter_page"""
+        return await self.aget_chapter_content(chapter_url)
+
+    # Chapter fetches are hedged: once enough latencies are known, a request
+    # slower than their p95 is sent a second time and the first answer wins
+    # (see sources.hedge).
+
+    _latency_tracker = None
+    _hedge_lock = threading.Lock()
+
+    @property
+    def latency_tracker(self):
+        """LatencyTracker of this source's chapter requests"""
+        if self._latency_tracker is None:
+            with self._hedge_lock:
+                if self._latency_tracker is None:
+                    self._latency_tracker = LatencyTracker()
+        return self._latency_tracker
+
+    def _timed_fetch(self, chapter_url, rate_limiter=None):
+        """
+        _fetch_chapter_page, reporting its outcome to rate_limiter
+
+        The caller has acquired rate_limiter. Only the request itself is
+        timed, so the rate limiter and the latency tracker see the
+        server's latency, not the time spent waiting for a slot or parsing.
+        """
+        started = time.monotonic()
+        try:
+            page_html = self._fetch_chapter_page(chapter_url)
+        except Exception as e:
+            if rate_limiter:
+                status_code, retry_after = response_info(e)
+                rate_limiter.release(chapter_url, time.monotonic() - started, status_code, retry_after,
+                                     error=True)
+            raise
+        latency = time.monotonic() - started
+        if rate_limiter:
+            rate_limiter.release(chapter_url, latency)
+        self.latency_tracker.record(latency)
+        return page_html
+
+    async def _atimed_fetch(self, chapter_url, rate_limiter=None):
+        """Async version of _timed_fetch"""
+        started = time.monotonic()
+        try:
+            page_html = await self._afetch_chapter_page(chapter_url)
+        except asyncio.CancelledError:
+            # Lost a hedging race: give the slot back, the latency means nothing
+            if rate_limiter:
+                rate_limiter.release(chapter_url, time.monotonic() - started)
+            raise
+        except Exception as e:
+            if rate_limiter:
+                status_code, retry_after = response_info(e)
+                rate_limiter.release(chapter_url, time.monotonic() - started, status_code, retry_after,
+                                     error=True)
+            raise
+        latency = time.monotonic() - started
+        if rate_limiter:
+            rate_limiter.release(chapter_url, latency)
+        self.latency_tracker.record(latency)
+        return page_html
+
+    def _admit_hedge(self, admitted):
+        """Count a hedge that got a request slot, or give its budget back and skip it"""
+        if not admitted:
+            self.latency_tracker.return_hedge()
+            raise HedgeSkipped()
+        record_hedge()
+
+    def _fetch_hedge(self, chapter_url, rate_limiter=None):
+        """
+        The duplicate of a slow request
+
+        It counts against the host like any other request, but does not
+        wait: when rate_limiter lets nothing through right now it raises
+        HedgeSkipped and the first request runs alone.
+        """
+        self._admit_hedge(not rate_limiter or rate_limiter.try_acquire(chapter_url))
+        return self._timed_fetch(chapter_url, rate_limiter)
+
+    async def _afetch_hedge(self, chapter_url, rate_limiter=None):
+        """Async version of _fetch_hedge"""
+        self._admit_hedge(not rate_limiter or await rate_limiter.try_acquire_async(chapter_url))
+        return await self._atimed_fetch(chapter_url, rate_limiter)
+
+    def _fetch_hedged(self, chapter_url, rate_limiter=None, hedge_pool=None):
+        """
+        Download a chapter page within rate_limiter, with a duplicate
+        request when it is slow
+
+        Both requests run in hedge_pool while this thread waits for the
+        first answer (a blocking request cannot be abandoned, so the one
+        that loses finishes there); without a pool there is no hedge. The
+        hedge delay is counted from when the request is sent, not from
+        when it started waiting for a slot. The hedge goes through the
+        host's limits but not the crawl's download slots, which it shares
+        with the request it duplicates.
+        """
+        if rate_limiter:
+            rate_limiter.acquire(chapter_url)
+        delay = self.latency_tracker.hedge_delay() if HEDGE_ENABLED and hedge_pool else None
+        if delay is None:
+            return self._timed_fetch(chapter_url, rate_limiter)
+        calls = [partial(self._timed_fetch, chapter_url, rate_limiter),
+                 partial(self._fetch_hedge, chapter_url, rate_limiter and rate_limiter.host_limiter)]
+        # An error is not hedged, it goes through the normal retry and backoff
+        return race(hedge_pool, calls, delay, self.latency_tracker.take_hedge, failover=False)
+
+    async def _afetch_hedged(self, chapter_url, rate_limiter=None):
+        """Async version of _fetch_hedged (the slower request is cancelled)"""
+        if rate_limiter:
+            await rate_limiter.acquire_async(chapter_url)
+        delay = self.latency_tracker.hedge_delay() if HEDGE_ENABLED else None
+        if delay is None:
+            return await self._atimed_fetch(chapter_url, rate_limiter)
+        calls = [partial(self._atimed_fetch, chapter_url, rate_limiter),
+                 partial(self._afetch_hedge, chapter_url, rate_limiter and rate_limiter.host_limiter)]
+        return await arace(calls, delay, self.latency_tracker.take_hedge, failover=False)
+
+    def _parse_chapter_page(self, page_html):
+        """
+        Extract title and cleaned content from a chapter page (CPU stage)
+
+        Must not use the network or instance state, it may run in a
+        worker process.
+
+        Args:
+            page_html: Page returned by _fetch_chapter_page
+
+        Returns:
+            Tuple (chapter title or None, content HTML)
+        """
+        return None, page_html
+
+    def _apply_parsed(self, chapter, parsed):
+        chapter_title, content = parsed
+        if chapter_title:
+            chapter.title = chapter_title
+        chapter.content = content
+
+    def _parse_page(self, page_html, parse_pool=None):
+        """
+        _parse_chapter_page in this thread, or in parse_pool when given
+
+        The thread waits for the pool but holds no download slot meanwhile.
+        """
+        if parse_pool is None:
+            return self._parse_chapter_page(page_html)
+        return parse_pool.submit(parse_chapter_in_worker, type(self), page_html).result()
+
+    async def _aparse_page(self, page_html, parse_pool=None):
+        """Async version of _parse_page"""
+        if parse_pool is None:
+            return self._parse_chapter_page(page_html)
+        return await asyncio.wrap_future(parse_pool.submit(parse_chapter_in_worker, type(self), page_html))
+
+    def _crawl_chapter(self, chapter, rate_limiter=None, parse_pool=None, hedge_pool=None):
+        """
+        Fetch one chapter and store its title and content in the Chapter
+
+        Args:
+            chapter: Chapter from get_chapter_list
+            rate_limiter: Acquired around the download only (optional)
+            parse_pool: ProcessPoolExecutor parsing the page (optional)
+            hedge_pool: ThreadPoolExecutor running hedged downloads (optional)
+        """
+        with stage('fetch'):
+            page_html = self._fetch_hedged(chapter.url, rate_limiter, hedge_pool)
+        with stage('parse'):
+            parsed = self._parse_page(page_html, parse_pool)
+        self._apply_parsed(chapter, parsed)
+
+    def _load_saved(self, chapter, cache, journal):
+        """
+        Fill chapter from the checkpoint journal or the cache
+
+        Returns:
+            'journal' or 'cache' on a hit, None if the chapter must be fetched
+        """
+        saved = journal.get(chapter.url) if journal is not None else None
+        if saved:
+            chapter.title = saved['title']
+            chapter.content = saved['content']
+            return 'journal'
+
+        cached = cache.get(self.name, chapter.url) if cache else None
+        if cached:
+            title, content = cached
+            if title:
+                chapter.title = title
+            chapter.content = content
+            if journal is not None:
+                journal.record(chapter)
+            return 'cache'
+
+        return None
+
+    def _save_fetched(self, chapter, cache, journal):
+        """Store a freshly fetched chapter in the cache and the journal"""
+        if cache:
+            cache.put(self.name, chapter.url, chapter.title, chapter.content)
+        if journal is not None:
+            journal.record(chapter)
+
+    def _resolve_cache(self, cache):
+        if cache is None and CHAPTER_CACHE_ENABLED:
+            return get_default_cache()
+        return cache
+
+    def _crawl_chapter_with_retries(self, idx, total, chapter, delay, max_retries,
+                                    rate_limiter=None, cache=None, journal=None, metrics=None,
+                                    progress=None, parse_pool=None, hedge_pool=None):
+        """
+        Crawl one chapter, retrying on error and falling back to a placeholder
+
+        Args:
+            idx: 1-based position of the chapter (for display)
+            total: Number of chapters being crawled
+            chapter: Chapter
+            delay: Base delay of the exponential backoff between retries
             max_retries: Number of retries on error
+            rate_limiter: HostRateLimiter to acquire around each request (optional)
+            cache: ChapterCache checked before, and filled after, the request (optional)
+            journal: CheckpointJournal checked before, and appended after, the request (optional)
+            metrics: CrawlMetrics recording this chapter (optional)
+            progress: Callable receiving the progress events of this chapter (optional)
+            parse_pool: ProcessPoolExecutor parsing the page (optional)
+            hedge_pool: ThreadPoolExecutor running hedged downloads (optional)
 
         Returns:
-            List of dicts containing chapter information and content
+            False if the chapter was already saved (journal or cache), True otherwise
         """
-        import time
+        if metrics is None:
+            metrics = CrawlMetrics()
+        if progress is None:
+            progress = no_progress
+        info = {'index': idx, 'total': total, 'url': chapter.url}
+        chapter_started = time.monotonic()
+        progress(make_event('chapter_started', title=chapter.title, **info))
+
+        with metrics.chapter(chapter.url) as record:
+            with stage('store'):
+                saved_in = self._load_saved(chapter, cache, journal)
+            if saved_in:
+                record['outcome'] = saved_in
+                progress(make_event('chapter_done', title=chapter.title, saved_in=saved_in,
+                                    elapsed=time.monotonic() - chapter_started, **info))
+                return False
+
+            retries = 0
+
+            while retries < max_retries:
+                try:
+                    self._crawl_chapter(chapter, rate_limiter, parse_pool, hedge_pool)
+                    with stage('store'):
+                        self._save_fetched(chapter, cache, journal)
+
+                    record['outcome'] = 'fetched'
+                    progress(make_event('chapter_done', title=chapter.title, saved_in='fetched',
+                                        elapsed=time.monotonic() - chapter_started, **info))
+                    return True
+
+                except Exception as e:
+                    retries += 1
+                    error_msg = str(e)
+                    _, retry_after = response_info(e)
+                    if retries < max_retries:
+                        metrics.add_retry()
+                        wait = backoff_delay(retries, delay, retry_after)
+                        progress(make_event('retry', title=chapter.title, attempt=retries,
+                                            error=error_msg, wait=wait, **info))
+                        with stage('retry_wait'):
+                            time.sleep(wait)
+                    else:
+                        record['outcome'] = 'failed'
+                        progress(make_event('failed', title=chapter.title, error=error_msg,
+                                            attempts=retries, elapsed=time.monotonic() - chapter_started,
+                                            **info))
+                        chapter.content = self.failure_placeholder.format(attempts=max_retries, error=error_msg)
+
+            return True
+
+    def iter_crawl_chapters(self, chapters, delay=None, max_retries=None, workers=None,
+                            rate_limiter=None, cache=None, journal=None, window=None,
+                            parse_processes=None, metrics=None, progress=None):
+        """
+        Crawl chapters and yield them one by one, in order, as they finish
+
+        Each yielded Chapter is a copy of the input chapter with its content
+        filled in; the input chapters are left untouched, so a consumer that
+        writes chapters out as they arrive (see
+        EpubCreator.create_epub_streaming) keeps memory flat. At most
+        `window` chapters are in flight or waiting to be consumed.
+
+        With parse_processes > 0 the download threads only fetch pages and
+        parsing/cleaning runs in a process pool, so throughput is not
+        bound to the one core holding the GIL.
 
+        Args:
+            chapters: Sequence of Chapter records (or dicts)
+            delay: Delay time between requests
+            max_retries: Number of retries on error
+            workers: Maximum number of concurrent downloads; an AdaptiveRateLimiter
+                runs fewer while its per-host window is smaller (1 = sequential)
+            rate_limiter: HostRateLimiter used in concurrent mode (optional)
+            cache: ChapterCache (defaults to the shared on-disk cache when
+                CHAPTER_CACHE_ENABLED)
+            journal: CheckpointJournal recording each finished chapter (optional)
+            window: Maximum number of chapters in flight (defaults to workers * 4)
+            parse_processes: Number of parser processes (0 = parse in the download threads)
+            metrics: CrawlMetrics collecting timings of the crawl (optional)
+            progress: Callable receiving progress events (see sources.progress;
+                defaults to a ProgressBar on stderr)
+
+        Yields:
+            Chapter records with content
+        """
         if delay is None:
             delay = DEFAULT_DELAY_BETWEEN_REQUESTS
         if max_retries is None:
             max_retries = DEFAULT_MAX_RETRIES
+        if workers is None:
+            workers = DEFAULT_CRAWL_WORKERS
+        cache = self._resolve_cache(cache)
+
+        if parse_processes is None:
+            parse_processes = DEFAULT_PARSE_PROCESSES
+        if metrics is None:
+            metrics = CrawlMetrics()
+        progress = get_progress(progress)
 
-        print(f"\nDang crawl noi dung {len(chapters)} chuong...")
+        total = len(chapters)
+        before = metrics.snapshot()
+        progress(make_event('crawl_started', total=total))
 
+        parse_pool = ProcessPoolExecutor(max_workers=parse_processes) if parse_processes > 0 else None
+        # A download and its hedge for each download slot
+        hedge_pool = ThreadPoolExecutor(max_workers=2 * max(1, workers)) if HEDGE_ENABLED else None
+        try:
+            if workers <= 1:
+                yield from self._iter_crawl_sequential(chapters, total, delay, max_retries,
+                                                       cache, journal, metrics, progress, parse_pool,
+                                                       hedge_pool)
+            else:
+                yield from self._iter_crawl_concurrent(chapters, total, delay, max_retries, workers,
+                                                       rate_limiter, cache, journal, window, metrics,
+                                                       progress, parse_pool, parse_processes, hedge_pool)
+        finally:
+            metrics.finish()
+            self._report_finished(progress, total, before, metrics)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True, cancel_futures=True)
+            if hedge_pool is not None:
+                # Requests that lost a race are not waited for
+                hedge_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _report_finished(self, progress, total, before, metrics):
+        """Emit crawl_finished with the counts of this crawl only (metrics may be shared)"""
+        after = metrics.snapshot()
+        failed = after['outcomes']['failed'] - before['outcomes']['failed']
+        progress(make_event(
+            'crawl_finished', total=total,
+            done=after['chapters'] - before['chapters'] - failed, failed=failed,
+            retries=after['retries'] - before['retries'],
+            elapsed=after['elapsed'] - before['elapsed']
+        ))
+
+    def _iter_crawl_sequential(self, chapters, total, delay, max_retries, cache, journal, metrics,
+                               progress, parse_pool, hedge_pool):
         for idx, chapter in enumerate(chapters, 1):
+            item = Chapter.coerce(chapter).copy()
+            if self._crawl_chapter_with_retries(idx, total, item, delay, max_retries, cache=cache,
+                                                journal=journal, metrics=metrics, progress=progress,
+                                                parse_pool=parse_pool, hedge_pool=hedge_pool):
+                time.sleep(delay)
+            yield item
+
+    def _iter_crawl_concurrent(self, chapters, total, delay, max_retries, workers,
+                               rate_limiter, cache, journal, window, metrics, progress,
+                               parse_pool, parse_processes, hedge_pool):
+        if rate_limiter is None:
+            rate_limiter = default_rate_limiter
+        if window is None:
+            window = workers * 4
+
+        # `workers` downloads at a time; the extra threads wait for the
+        # parser processes without holding a download slot
+        rate_limiter = ConcurrencyLimiter(rate_limiter, workers)
+        threads = workers + (parse_processes if parse_pool is not None else 0)
+        executor = ThreadPoolExecutor(max_workers=threads)
+        # Bounded queue between the crawl and the consumer: chapters are
+        # handed out in order, with at most `window` in flight
+        pending = deque()
+        try:
+            for idx, chapter in enumerate(chapters, 1):
+                item = Chapter.coerce(chapter).copy()
+                future = executor.submit(self._crawl_chapter_with_retries, idx, total, item,
+                                         delay, max_retries, rate_limiter, cache, journal, metrics,
+                                         progress, parse_pool, hedge_pool)
+                pending.append((future, item))
+                if len(pending) >= window:
+                    future, item = pending.popleft()
+                    future.result()
+                    yield item
+
+            while pending:
+                future, item = pending.popleft()
+                future.result()
+                yield item
+        finally:
+            # On Ctrl-C (or an abandoned generator) drop the queued chapters
+            # instead of crawling them all
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def crawl_all_chapters(self, chapters, delay=None, max_retries=None, workers=None,
+                           rate_limiter=None, cache=None, journal=None, parse_processes=None,
+                           metrics=None, progress=None):
+        """
+        Crawl content of all chapters
+
+        With workers > 1 chapters are fetched concurrently, paced by a
+        per-host token bucket instead of a fixed delay. Chapter order is kept.
+        Chapters found in the checkpoint journal or the chapter cache are
+        not requested again, which is how an interrupted crawl is resumed.
+        The input chapters are not modified.
+
+        Args:
+            chapters: Sequence of Chapter records (or dicts)
+            delay: Delay time between requests
+            max_retries: Number of retries on error
+            workers: Maximum number of concurrent downloads; an AdaptiveRateLimiter
+                runs fewer while its per-host window is smaller (1 = sequential)
+            rate_limiter: HostRateLimiter used in concurrent mode (optional)
+            cache: ChapterCache (defaults to the shared on-disk cache when
+                CHAPTER_CACHE_ENABLED)
+            journal: CheckpointJournal recording each finished chapter (optional)
+            parse_processes: Number of parser processes (0 = parse in the download threads)
+            metrics: CrawlMetrics collecting timings of the crawl (optional)
+            progress: Callable receiving progress events (defaults to a ProgressBar)
+
+        Returns:
+            List of Chapter records with content
+        """
+        return list(self.iter_crawl_chapters(chapters, delay, max_retries, workers, rate_limiter,
+                                             cache, journal, parse_processes=parse_processes,
+                                             metrics=metrics, progress=progress))
+
+    async def _acrawl_chapter(self, chapter, rate_limiter=None, parse_pool=None):
+        """Async version of _crawl_chapter"""
+        with stage('fetch'):
+            page_html = await self._afetch_hedged(chapter.url, rate_limiter)
+        with stage('parse'):
+            parsed = await self._aparse_page(page_html, parse_pool)
+        self._apply_parsed(chapter, parsed)
+
+    async def _acrawl_chapter_with_retries(self, idx, total, chapter, delay, max_retries,
+                                           rate_limiter, cache=None, journal=None,
+                                           metrics=None, progress=None, parse_pool=None):
+        """Async version of _crawl_chapter_with_retries"""
+        if metrics is None:
+            metrics = CrawlMetrics()
+        if progress is None:
+            progress = no_progress
+        info = {'index': idx, 'total': total, 'url': chapter.url}
+        chapter_started = time.monotonic()
+        progress(make_event('chapter_started', title=chapter.title, **info))
+
+        with metrics.chapter(chapter.url) as record:
+            with stage('store'):
+                saved_in = self._load_saved(chapter, cache, journal)
+            if saved_in:
+                record['outcome'] = saved_in
+                progress(make_event('chapter_done', title=chapter.title, saved_in=saved_in,
+                                    elapsed=time.monotonic() - chapter_started, **info))
+                return False
+
             retries = 0
-            success = False
 
-            while retries < max_retries and not success:
+            while retries < max_retries:
                 try:
-                    if retries == 0:
-                        print(f"  [{idx}/{len(chapters)}] {chapter['title']}...", end=' ')
-
-                    content = self.get_chapter_content(chapter['url'])
-                    chapter['content'] = content
+                    await self._acrawl_chapter(chapter, rate_limiter, parse_pool)
+                    with stage('store'):
+                        self._save_fetched(chapter, cache, journal)
 
-                    print("+")
-                    success = True
-                    time.sleep(delay)
+                    record['outcome'] = 'fetched'
+                    progress(make_event('chapter_done', title=chapter.title, saved_in='fetched',
+                                        elapsed=time.monotonic() - chapter_started, **info))
+                    return True
 
                 except Exception as e:
                     retries += 1
                     error_msg = str(e)
+                    _, retry_after = response_info(e)
                     if retries < max_retries:
-                        print(f"x ({error_msg}) - Thu lai {retries}/{max_retries}...", end=' ')
-                        time.sleep(delay * 2)
+                        metrics.add_retry()
+                        wait = backoff_delay(retries, delay, retry_after)
+                        progress(make_event('retry', title=chapter.title, attempt=retries,
+                                            error=error_msg, wait=wait, **info))
+                        with stage('retry_wait'):
+                            await asyncio.sleep(wait)
                     else:
-                        print(f"x Bo qua ({error_msg})")
-                        chapter['content'] = f"<p>Loi khi tai chuong sau {max_retries} lan thu: {error_msg}</p>"
+                        record['outcome'] = 'failed'
+                        progress(make_event('failed', title=chapter.title, error=error_msg,
+                                            attempts=retries, elapsed=time.monotonic() - chapter_started,
+                                            **info))
+                        chapter.content = self.failure_placeholder.format(attempts=max_retries, error=error_msg)
+
+            return True
+
+    async def acrawl_all_chapters(self, chapters, delay=None, max_retries=None, workers=None,
+                                  rate_limiter=None, cache=None, journal=None,
+                                  parse_processes=None, metrics=None, progress=None):
+        """
+        Async version of crawl_all_chapters
+
+        All chapters are scheduled on the running event loop; at most
+        `workers` requests are in flight for this call, and requests are
+        paced by the (shared) per-host rate limiter. Several calls, for
+        different novels or sources, can run concurrently with asyncio.gather.
+
+        Args:
+            chapters: Sequence of Chapter records (or dicts), not modified
+            delay: Base delay of the exponential backoff between retries
+            max_retries: Number of retries on error
+            workers: Maximum number of concurrent requests
+            rate_limiter: HostRateLimiter (defaults to the shared one)
+            cache: ChapterCache (defaults to the shared on-disk cache when
+                CHAPTER_CACHE_ENABLED)
+            journal: CheckpointJournal recording each finished chapter (optional)
+            parse_processes: Number of parser processes (0 = parse on the event loop)
+            metrics: CrawlMetrics collecting timings of the crawl (optional)
+            progress: Callable receiving progress events (defaults to a ProgressBar)
+
+        Returns:
+            List of Chapter records with content
+        """
+        if delay is None:
+            delay = DEFAULT_DELAY_BETWEEN_REQUESTS
+        if max_retries is None:
+            max_retries = DEFAULT_MAX_RETRIES
+        if workers is None:
+            workers = DEFAULT_CRAWL_WORKERS
+        if parse_processes is None:
+            parse_processes = DEFAULT_PARSE_PROCESSES
+        if rate_limiter is None:
+            rate_limiter = default_rate_limiter
+        if metrics is None:
+            metrics = CrawlMetrics()
+        cache = self._resolve_cache(cache)
+        progress = get_progress(progress)
+
+        chapters = [Chapter.coerce(chapter).copy() for chapter in chapters]
+        total = len(chapters)
+        before = metrics.snapshot()
+        progress(make_event('crawl_started', total=total))
+
+        # Each call has its own pool and download slots, so several calls
+        # can run concurrently on one source
+        parse_pool = ProcessPoolExecutor(max_workers=parse_processes) if parse_processes > 0 else None
+        rate_limiter = ConcurrencyLimiter(rate_limiter, workers, asynchronous=True)
+        try:
+            await asyncio.gather(*(
+                self._acrawl_chapter_with_retries(idx, total, chapter, delay, max_retries,
+                                                  rate_limiter, cache, journal, metrics, progress,
+                                                  parse_pool)
+                for idx, chapter in enumerate(chapters, 1)
+            ))
+        finally:
+            metrics.finish()
+            self._report_finished(progress, total, before, metrics)
+            if parse_pool is not None:
+                # Waiting for the workers to exit must not block the event loop
+                await asyncio.to_thread(parse_pool.shutdown, wait=True, cancel_futures=True)
 
         return chapters
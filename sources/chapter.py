@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Chapter records and the compact chapter list (table of contents)
+
+A Chapter is what moves through the pipeline: get_chapter_list creates
+them without content, the crawl fills in 'content' (and sometimes a
+better title) and EpubCreator writes them out.
+
+A novel's table of contents can have tens of thousands of chapters, so
+get_chapter_list returns a ChapterList instead of a list of records: the
+titles and slugs are kept as UTF-8 in one buffer per column, and URLs
+that follow the source's URL template are derived from the slug instead
+of being stored. Chapter records are created when an entry is read.
+
+Sources whose chapters are simply numbered (metruyenhot.me) return a
+ChapterRange, which stores nothing per chapter at all.
+"""
+
+from array import array
+from dataclasses import dataclass, replace
+from collections.abc import Sequence
+
+
+@dataclass(slots=True)
+class Chapter:
+    """One chapter of a novel"""
+
+    title: str
+    url: str
+    slug: str = None
+    content: str = None
+
+    @classmethod
+    def coerce(cls, value):
+        """Chapter from a Chapter or a dict with 'title', 'url', 'slug' and 'content'"""
+        if isinstance(value, cls):
+            return value
+        return cls(value['title'], value['url'], value.get('slug'), value.get('content'))
+
+    def copy(self):
+        return replace(self)
+
+
+class _StringColumn:
+    """Append-only column of strings kept as one UTF-8 buffer and end offsets"""
+
+    __slots__ = ('data', 'ends')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array('I')
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, index):
+        start = self.ends[index - 1] if index else 0
+        return self.data[start:self.ends[index]].decode('utf-8')
+
+    def append(self, value):
+        self.data += value.encode('utf-8')
+        self.ends.append(len(self.data))
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+
+class ChapterList(Sequence):
+    """
+    Compact, columnar table of contents
+
+    Behaves like a read-only list of Chapter records (indexing, slicing,
+    iteration, len). Each access builds a new Chapter, so changing the
+    returned record does not change the list.
+    """
+
+    def __init__(self, url_template=None, chapters=()):
+        """
+        Args:
+            url_template: str.format template building a chapter URL from its
+                slug, e.g. 'https://host/novel/{slug}' (optional)
+            chapters: Initial Chapter records (optional)
+        """
+        self.url_template = url_template
+        self.titles = _StringColumn()
+        self.slugs = _StringColumn()
+        # URLs that do not follow url_template, by position
+        self.urls = {}
+        self.extend(chapters)
+
+    def append(self, chapter):
+        """Add a Chapter (its content is not kept)"""
+        slug = chapter.slug or ''
+        if self.url_template is None or chapter.url != self.url_template.format(slug=slug):
+            self.urls[len(self.titles)] = chapter.url
+        self.titles.append(chapter.title)
+        self.slugs.append(slug)
+
+    def extend(self, chapters):
+        for chapter in chapters:
+            self.append(Chapter.coerce(chapter))
+
+    def __len__(self):
+        return len(self.titles)
+
+    def url(self, index):
+        """URL of the chapter at index, without building the record"""
+        url = self.urls.get(index)
+        if url is None:
+            url = self.url_template.format(slug=self.slugs[index])
+        return url
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ChapterList(self.url_template, (self[i] for i in range(*index.indices(len(self)))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('chapter index out of range')
+        return Chapter(self.titles[index], self.url(index), self.slugs[index] or None)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"<ChapterList of {len(self)} chapters>"
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the columns (bytes)"""
+        urls = sum(len(url) + 60 for url in self.urls.values())
+        return self.titles.nbytes + self.slugs.nbytes + urls
+
+
+class ChapterRange(Sequence):
+    """
+    Lazy table of contents of chapters numbered 1..N
+
+    Title, slug and URL of each chapter are derived from its number when
+    the entry is read. Slicing returns another ChapterRange in O(1), so
+    picking a range of chapters builds nothing for the chapters left out.
+    """
+
+    def __init__(self, url_template, numbers, title_template='Chương {number}',
+                 slug_template='chuong-{number}'):
+        """
+        Args:
+            url_template: str.format template building a chapter URL from its
+                slug, e.g. 'https://host/novel/{slug}/'
+            numbers: range of chapter numbers, e.g. range(1, total + 1)
+            title_template: Template of the title, from {number}
+            slug_template: Template of the slug, from {number}
+        """
+        self.url_template = url_template
+        self.numbers = numbers
+        self.title_template = title_template
+        self.slug_template = slug_template
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def url(self, index):
+        """URL of the chapter at index, without building the record"""
+        return self.url_template.format(slug=self.slug_template.format(number=self.numbers[index]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ChapterRange(self.url_template, self.numbers[index],
+                                self.title_template, self.slug_template)
+        number = self.numbers[index]
+        slug = self.slug_template.format(number=number)
+        return Chapter(self.title_template.format(number=number), self.url_template.format(slug=slug), slug)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        if not self.numbers:
+            return "<ChapterRange of 0 chapters>"
+        return f"<ChapterRange of chapters {self.numbers[0]}..{self.numbers[-1]}>"
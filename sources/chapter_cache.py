@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent on-disk cache of cleaned chapter content
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from config import CHAPTER_CACHE_PATH, CHAPTER_CACHE_MAX_BYTES
+
+
+class ChapterCache:
+    """
+    SQLite cache of cleaned chapter HTML, keyed by source name and chapter URL
+
+    Content is stored zlib-compressed. When the total stored size grows
+    past max_bytes, the least recently used chapters are evicted.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        """
+        Args:
+            path: SQLite database file (defaults to CHAPTER_CACHE_PATH)
+            max_bytes: Maximum total size of stored content (defaults to CHAPTER_CACHE_MAX_BYTES)
+        """
+        self.path = path or CHAPTER_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else CHAPTER_CACHE_MAX_BYTES
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS chapters (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_chapters_accessed ON chapters (accessed_at)')
+        self.conn.commit()
+
+        row = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM chapters').fetchone()
+        self.total_bytes = row[0]
+
+    @staticmethod
+    def make_key(source_name, chapter_url):
+        """Cache key for a chapter of a source"""
+        return hashlib.sha1(f"{source_name}\0{chapter_url}".encode('utf-8')).hexdigest()
+
+    def get(self, source_name, chapter_url):
+        """
+        Look up a chapter
+
+        Args:
+            source_name: Name of the source
+            chapter_url: URL of the chapter
+
+        Returns:
+            Tuple (title, content) or None if not cached
+        """
+        key = self.make_key(source_name, chapter_url)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT title, content FROM chapters WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('UPDATE chapters SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self.conn.commit()
+
+        title, content = row
+        return title, zlib.decompress(content).decode('utf-8')
+
+    def put(self, source_name, chapter_url, title, content):
+        """
+        Store a chapter, evicting old entries if the cache is full
+
+        Args:
+            source_name: Name of the source
+            chapter_url: URL of the chapter
+            title: Chapter title
+            content: Cleaned chapter content (HTML)
+        """
+        key = self.make_key(source_name, chapter_url)
+        blob = zlib.compress(content.encode('utf-8'))
+
+        with self.lock:
+            old = self.conn.execute('SELECT size FROM chapters WHERE key = ?', (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+
+            self.conn.execute(
+                'INSERT OR REPLACE INTO chapters (key, source, url, title, content, size, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, source_name, chapter_url, title, blob, len(blob), time.time())
+            )
+            self.total_bytes += len(blob)
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        # Drop least recently used chapters until we are back under 90% of the limit
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute('SELECT key, size FROM chapters ORDER BY accessed_at').fetchall()
+        evicted = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany('DELETE FROM chapters WHERE key = ?', evicted)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Shared ChapterCache at CHAPTER_CACHE_PATH (opened on first use)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ChapterCache()
+        return _default_cache
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Append-only checkpoint journal for resumable crawls
+"""
+
+import os
+import re
+import json
+import threading
+
+from config import CHECKPOINT_DIR
+
+
+def checkpoint_path(source_name, novel_slug):
+    """
+    Journal file path for a novel
+
+    Args:
+        source_name: Name of the source
+        novel_slug: Slug of the novel
+
+    Returns:
+        Path of the journal file
+    """
+    safe_name = re.sub(r'[^\w.-]', '_', f"{source_name}_{novel_slug}")
+    return os.path.join(CHECKPOINT_DIR, f"{safe_name}.jsonl")
+
+
+class CheckpointJournal:
+    """
+    JSON-lines journal of finished chapters
+
+    Each finished chapter is appended (and flushed) as soon as it lands, so
+    a crawl that dies half way can be resumed. Only the byte offset of each
+    record is kept in memory; content is read back from disk on demand.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Journal file path
+        """
+        self.path = path
+        self.offsets = {}
+        self.lock = threading.Lock()
+        self.file = None
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._load()
+        self.file = open(self.path, 'ab')
+
+    def _load(self):
+        # Index existing records; a truncated last line (crash mid-write) is ignored
+        if not os.path.exists(self.path):
+            return
+
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.offsets[record['url']] = offset
+                valid_size = f.tell()
+
+        if valid_size < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_size)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, chapter_url):
+        return chapter_url in self.offsets
+
+    def get(self, chapter_url):
+        """
+        Read a finished chapter back from the journal
+
+        Args:
+            chapter_url: URL of the chapter
+
+        Returns:
+            dict {'url', 'title', 'content'} or None
+        """
+        offset = self.offsets.get(chapter_url)
+        if offset is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def record(self, chapter):
+        """
+        Append a finished chapter
+
+        Args:
+            chapter: Chapter with url, title and content
+        """
+        line = json.dumps({
+            'url': chapter.url,
+            'title': chapter.title,
+            'content': chapter.content
+        }, ensure_ascii=False).encode('utf-8') + b'\n'
+
+        with self.lock:
+            offset = self.file.tell()
+            self.file.write(line)
+            self.file.flush()
+            self.offsets[chapter.url] = offset
+
+    def reset(self):
+        """Forget every recorded chapter"""
+        with self.lock:
+            self.file.truncate(0)
+            self.file.seek(0)
+            self.offsets = {}
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        """Close and delete the journal (after the EPUB has been written)"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
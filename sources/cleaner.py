@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Single-pass chapter content sanitizer shared by all sources
+"""
+
+import re
+import html
+
+from bs4.element import Tag, PreformattedString
+
+from sources.metrics import stage
+
+# Dropped together with everything inside them
+SKIP_TAGS = frozenset(['script', 'style', 'iframe', 'ins', 'noscript', 'template'])
+
+# Embedded media is dropped too: the EPUB only carries the cover, and a
+# reference to a remote image would be a broken resource in most readers.
+# The alt text of an image is kept as a paragraph of its own.
+MEDIA_TAGS = frozenset(['img', 'picture', 'svg', 'video', 'audio', 'object', 'embed'])
+
+# Kept as-is inside paragraphs
+INLINE_TAGS = frozenset(['b', 'strong', 'i', 'em', 'u', 's', 'sub', 'sup'])
+
+# Start and end a paragraph
+BLOCK_TAGS = frozenset([
+    'p', 'div', 'section', 'article', 'blockquote', 'center',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'table', 'tr', 'td', 'th', 'hr'
+])
+
+AD_PATTERN = re.compile(r'ads|banner', re.I)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _is_ad(tag):
+    if tag.name != 'div':
+        return False
+    if AD_PATTERN.search(tag.get('id') or ''):
+        return True
+    return any(AD_PATTERN.search(cls) for cls in tag.get('class') or ())
+
+
+class _ParagraphBuilder:
+    """Collects text and inline tags into <p> paragraphs"""
+
+    def __init__(self):
+        self.paragraphs = []
+        self.parts = []
+        self.inline_stack = []
+        # Inline tags whose opening tag was written in the current paragraph
+        # (always a prefix of inline_stack)
+        self.opened = 0
+
+    def text(self, text):
+        if not self.parts:
+            text = text.lstrip()
+            if not text:
+                return
+        # Re-open inline tags that span a paragraph break
+        while self.opened < len(self.inline_stack):
+            self.parts.append(f'<{self.inline_stack[self.opened]}>')
+            self.opened += 1
+        self.parts.append(html.escape(text, quote=False))
+
+    def open_inline(self, name):
+        self.inline_stack.append(name)
+
+    def close_inline(self):
+        name = self.inline_stack.pop()
+        if self.opened > len(self.inline_stack):
+            self.parts.append(f'</{name}>')
+            self.opened -= 1
+
+    def flush(self):
+        if self.parts:
+            for name in reversed(self.inline_stack[:self.opened]):
+                self.parts.append(f'</{name}>')
+            paragraph = ''.join(self.parts).rstrip()
+            if paragraph:
+                self.paragraphs.append(f'<p>{paragraph}</p>')
+        self.parts = []
+        self.opened = 0
+
+
+def clean_chapter_content(content_div):
+    """
+    Sanitize a chapter content element in one walk over its tree
+
+    Drops script/style/iframe/ins and ad divs, turns <br> runs, block
+    elements (table cells included) and (outside <p>) line breaks into
+    paragraph boundaries, and keeps basic inline formatting. Images and
+    other embedded media are dropped; an image's alt text is kept as
+    its own paragraph.
+
+    Args:
+        content_div: BeautifulSoup Tag containing the chapter content
+
+    Returns:
+        String containing chapter content (HTML)
+    """
+    with stage('clean'):
+        return _clean_tree(content_div)
+
+
+def _clean_tree(content_div):
+    builder = _ParagraphBuilder()
+    paragraph_depth = 0
+
+    iterators = [iter(content_div.contents)]
+    tags = [content_div]
+
+    while iterators:
+        for node in iterators[-1]:
+            if isinstance(node, Tag):
+                name = node.name
+                if name in SKIP_TAGS or _is_ad(node):
+                    continue
+                if name == 'br':
+                    builder.flush()
+                    continue
+                if name in MEDIA_TAGS:
+                    alt = node.get('alt') if name == 'img' else None
+                    if alt and alt.strip():
+                        builder.flush()
+                        builder.text(WHITESPACE_PATTERN.sub(' ', alt))
+                        builder.flush()
+                    continue
+                if name in BLOCK_TAGS:
+                    builder.flush()
+                    if name == 'p':
+                        paragraph_depth += 1
+                elif name in INLINE_TAGS:
+                    builder.open_inline(name)
+                iterators.append(iter(node.contents))
+                tags.append(node)
+                break
+
+            if isinstance(node, PreformattedString):
+                # Comments, CDATA, doctype...
+                continue
+
+            if paragraph_depth or '\n' not in node:
+                builder.text(WHITESPACE_PATTERN.sub(' ', node))
+            else:
+                # Bare text outside <p>: each line is a paragraph
+                for line_idx, line in enumerate(node.split('\n')):
+                    if line_idx:
+                        builder.flush()
+                    builder.text(WHITESPACE_PATTERN.sub(' ', line))
+        else:
+            iterators.pop()
+            tag = tags.pop()
+            if not iterators:
+                break
+            name = tag.name
+            if name in BLOCK_TAGS:
+                builder.flush()
+                if name == 'p':
+                    paragraph_depth -= 1
+            elif name in INLINE_TAGS:
+                builder.close_inline()
+
+    builder.flush()
+    return '<div>' + '\n'.join(builder.paragraphs) + '</div>'
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hedged requests: race a duplicate against a request that is slower than usual
+
+A few chapter requests stall far longer than the rest (a slow backend, a
+dropped packet), and with many chapters these stragglers set the total
+time. When a request has not answered after the p95 latency measured so
+far, the same request is sent again and whichever answers first wins.
+Hedges are capped to a share of all requests and go through the same
+rate limiter as the other requests (a hedge finding no free request slot
+is skipped), so the extra load on the site stays small.
+
+race() and arace() run the attempts; mirror mode (sources.mirror) uses
+them too, with attempts going to different sites.
+"""
+
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from config import HEDGE_QUANTILE, HEDGE_MIN_SAMPLES, HEDGE_WINDOW, HEDGE_MIN_DELAY, HEDGE_MAX_RATIO
+
+
+class HedgeSkipped(Exception):
+    """A hedge found the site's request slots full and was not sent"""
+
+
+class LatencyTracker:
+    """Recent request latencies of one site and the hedge budget"""
+
+    def __init__(self, quantile=HEDGE_QUANTILE, min_samples=HEDGE_MIN_SAMPLES, window=HEDGE_WINDOW,
+                 min_delay=HEDGE_MIN_DELAY, max_ratio=HEDGE_MAX_RATIO):
+        """
+        Args:
+            quantile: Latency quantile after which a request is hedged
+            min_samples: Samples needed before hedging starts
+            window: Number of recent samples kept
+            min_delay: Lower bound of the hedge delay (seconds)
+            max_ratio: Maximum share of requests that get a hedge
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency):
+        """Add the latency (seconds) of a successful request"""
+        with self.lock:
+            self.samples.append(latency)
+
+    def hedge_delay(self):
+        """
+        Count a new request and return how long to wait before hedging it
+
+        Returns:
+            Seconds, or None while there are not enough samples yet
+        """
+        with self.lock:
+            self.requests += 1
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        position = min(len(ordered) - 1, int(len(ordered) * self.quantile))
+        return max(self.min_delay, ordered[position])
+
+    def take_hedge(self):
+        """Reserve a hedge within the budget; False when the budget is used up"""
+        with self.lock:
+            if self.hedges + 1 > self.requests * self.max_ratio:
+                return False
+            self.hedges += 1
+            return True
+
+    def return_hedge(self):
+        """Give back a hedge reserved with take_hedge that was not sent"""
+        with self.lock:
+            self.hedges = max(0, self.hedges - 1)
+
+
+def _retrieve_error(task):
+    # A loser that failed after the race was decided: mark its error as
+    # seen so asyncio does not log it as never retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+def race(executor, calls, hedge_delay=None, may_hedge=None, failover=True):
+    """
+    Run calls[0] and start the next call when it is slow or fails
+
+    Each call runs in `executor`, in a copy of the caller's context (so
+    crawl metrics still reach the current chapter).
+
+    Args:
+        executor: ThreadPoolExecutor running the calls
+        calls: Callables without arguments, in order of preference; one
+            raising HedgeSkipped is left out without counting as an error
+        hedge_delay: Seconds after which the next call is started while
+            the running ones have not answered (None = never)
+        may_hedge: Callable returning False to skip a hedge (optional)
+        failover: Start the next call when every running one failed
+
+    Returns:
+        Result of the first call that succeeds
+
+    Raises:
+        The last error when no call succeeded
+    """
+    pending = set()
+    errors = []
+    next_call = 0
+
+    def launch():
+        nonlocal next_call
+        future = executor.submit(contextvars.copy_context().run, calls[next_call])
+        next_call += 1
+        pending.add(future)
+
+    launch()
+    while pending:
+        can_hedge = hedge_delay is not None and next_call < len(calls)
+        done, _ = wait(pending, timeout=hedge_delay if can_hedge else None, return_when=FIRST_COMPLETED)
+        if not done:
+            if may_hedge is None or may_hedge():
+                launch()
+            else:
+                hedge_delay = None
+            continue
+        for future in done:
+            pending.discard(future)
+            try:
+                return future.result()
+            except HedgeSkipped:
+                pass
+            except Exception as e:
+                errors.append(e)
+        if not pending and failover and next_call < len(calls):
+            launch()
+
+    raise errors[-1]
+
+
+async def arace(calls, hedge_delay=None, may_hedge=None, failover=True):
+    """
+    Async version of race; calls return coroutines and the losers are cancelled
+    """
+    pending = set()
+    errors = []
+    next_call = 0
+
+    def launch():
+        nonlocal next_call
+        task = asyncio.ensure_future(calls[next_call]())
+        task.add_done_callback(_retrieve_error)
+        pending.add(task)
+        next_call += 1
+
+    launch()
+    try:
+        while pending:
+            can_hedge = hedge_delay is not None and next_call < len(calls)
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay if can_hedge else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if may_hedge is None or may_hedge():
+                    launch()
+                else:
+                    hedge_delay = None
+                continue
+            for task in done:
+                pending.discard(task)
+                try:
+                    return task.result()
+                except HedgeSkipped:
+                    pass
+                except Exception as e:
+                    errors.append(e)
+            if not pending and failover and next_call < len(calls):
+                launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise errors[-1]
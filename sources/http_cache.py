@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP conditional request cache for novel pages, covers and chapter lists
+
+Responses carrying an ETag or Last-Modified header are stored on disk.
+The next request for the same URL sends If-None-Match/If-Modified-Since
+and a 304 Not Modified answer is served from the stored body, so
+re-checking a novel for updates costs almost no bandwidth.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+
+from config import HTTP_CACHE_PATH
+
+# Headers that describe the transfer rather than the stored (decoded) body
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class HttpCache:
+    """SQLite store of validated GET responses, keyed by URL"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: SQLite database file (defaults to HTTP_CACHE_PATH)
+        """
+        self.path = path or HTTP_CACHE_PATH
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def get(self, url):
+        """
+        Look up a stored response
+
+        Args:
+            url: Request URL
+
+        Returns:
+            dict with 'etag', 'last_modified', 'headers' and 'content', or None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, headers, content FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        etag, last_modified, headers, content = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': json.loads(headers),
+            'content': zlib.decompress(content)
+        }
+
+    def put(self, url, headers, content):
+        """
+        Store a response if it carries a validator
+
+        Args:
+            url: Request URL
+            headers: Response headers (mapping)
+            content: Decoded response body (bytes)
+
+        Returns:
+            True if the response was stored
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return False
+
+        stored_headers = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (url, etag, last_modified, headers, content, stored_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, json.dumps(stored_headers), zlib.compress(content), time.time())
+            )
+            self.conn.commit()
+        return True
+
+    @staticmethod
+    def conditional_headers(entry):
+        """If-None-Match/If-Modified-Since headers that revalidate a stored entry"""
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def merged_headers(entry, fresh_headers):
+        """Stored headers updated with the ones sent along a 304"""
+        headers = dict(entry['headers'])
+        for key, value in fresh_headers.items():
+            if key.lower() not in _DROPPED_HEADERS:
+                headers[key] = value
+        return headers
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    requests transport adapter that revalidates GETs against an HttpCache
+
+    Mounted on a source's session, it is transparent to the callers: a 304
+    comes back as a normal 200 response whose body is the stored one, with
+    `from_cache` set to True.
+    """
+
+    def __init__(self, cache=None, skip=None, **kwargs):
+        """
+        Args:
+            cache: HttpCache to use (defaults to the shared one, opened on first use)
+            skip: Compiled regex; matching URLs bypass the cache (optional)
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.skip = skip
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET' or (self.skip is not None and self.skip.search(request.url)):
+            return super().send(request, **kwargs)
+        # The caller is doing its own revalidation
+        if 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers:
+            return super().send(request, **kwargs)
+
+        cache = self.cache or get_default_http_cache()
+        entry = cache.get(request.url)
+        if entry:
+            request.headers.update(cache.conditional_headers(entry))
+
+        response = super().send(request, **kwargs)
+        response.from_cache = False
+
+        if response.status_code == 304 and entry:
+            # Reading the (empty) body hands the connection back to the pool
+            response.content
+            response._content = entry['content']
+            response.status_code = 200
+            response.reason = 'OK'
+            headers = cache.merged_headers(entry, response.headers)
+            response.headers.clear()
+            response.headers.update(headers)
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.from_cache = True
+        elif response.status_code == 200 and not kwargs.get('stream'):
+            # Streamed responses are left to the caller, who may stop reading early
+            if 'ETag' in response.headers or 'Last-Modified' in response.headers:
+                cache.put(request.url, response.headers, response.content)
+
+        return response
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_http_cache():
+    """Shared HttpCache at HTTP_CACHE_PATH (opened on first use)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
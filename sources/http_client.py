@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Async HTTP client used by the async source API
+
+Uses httpx when installed, otherwise aiohttp. Neither is a hard
+dependency: the sync API keeps working with requests only.
+"""
+
+import json
+import time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from config import DEFAULT_HEADERS, DEFAULT_TIMEOUT
+from sources.metrics import record_response
+
+
+class HTTPStatusError(Exception):
+    """Raised by HttpResponse.raise_for_status for 4xx/5xx responses"""
+
+    def __init__(self, response):
+        super().__init__(f"{response.status_code} Error for url: {response.url}")
+        self.response = response
+
+
+class HttpResponse:
+    """Fully-read response, independent of the backend that fetched it"""
+
+    def __init__(self, url, status_code, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.from_cache = False
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPStatusError(self)
+
+
+class AsyncHttpClient:
+    """
+    Small async GET client shared by sources
+
+    One client can be shared by several sources (and novels) running on the
+    same event loop so that they also share the connection pool.
+    """
+
+    def __init__(self, headers=None, timeout=None, max_connections=100):
+        """
+        Args:
+            headers: Default headers (defaults to DEFAULT_HEADERS)
+            timeout: Timeout in seconds, or a (connect, read) tuple (defaults
+                to DEFAULT_TIMEOUT)
+            max_connections: Size of the connection pool
+        """
+        if httpx is None and aiohttp is None:
+            raise ImportError("Cần cài httpx hoặc aiohttp để dùng API async (uv add httpx)")
+
+        self.headers = dict(headers if headers is not None else DEFAULT_HEADERS)
+        timeout = timeout if timeout is not None else DEFAULT_TIMEOUT
+        self.connect_timeout, self.read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self.max_connections = max_connections
+        self._client = None
+
+    def _get_client(self):
+        # Created lazily so that the underlying client binds to the running loop
+        if self._client is None:
+            if httpx is not None:
+                self._client = httpx.AsyncClient(
+                    headers=self.headers,
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=self.max_connections)
+                )
+            else:
+                self._client = aiohttp.ClientSession(
+                    headers=self.headers,
+                    timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout,
+                                                  sock_read=self.read_timeout),
+                    connector=aiohttp.TCPConnector(limit=self.max_connections)
+                )
+        return self._client
+
+    async def get(self, url, headers=None, cache=None):
+        """
+        Send a GET request and read the whole body
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers (optional)
+            cache: HttpCache used to revalidate the response (optional)
+
+        Returns:
+            HttpResponse
+        """
+        if cache is None:
+            return await self._get(url, headers)
+
+        entry = cache.get(url)
+        if entry:
+            headers = {**(headers or {}), **cache.conditional_headers(entry)}
+
+        response = await self._get(url, headers)
+        if response.status_code == 304 and entry:
+            response = HttpResponse(response.url, 200, cache.merged_headers(entry, response.headers),
+                                    entry['content'], response.encoding)
+            response.from_cache = True
+        elif response.status_code == 200:
+            cache.put(url, response.headers, response.content)
+        return response
+
+    async def _get(self, url, headers):
+        client = self._get_client()
+        started = time.perf_counter()
+
+        if httpx is not None:
+            response = await client.send(client.build_request('GET', url, headers=headers), stream=True)
+            ttfb = time.perf_counter() - started
+            try:
+                content = await response.aread()
+            finally:
+                await response.aclose()
+            record_response(ttfb, len(content))
+            return HttpResponse(str(response.url), response.status_code, response.headers,
+                                content, response.encoding)
+
+        async with client.get(url, headers=headers) as response:
+            ttfb = time.perf_counter() - started
+            content = await response.read()
+            record_response(ttfb, len(content))
+            return HttpResponse(str(response.url), response.status, response.headers,
+                                content, response.get_encoding())
+
+    async def aclose(self):
+        """Close the underlying client"""
+        if self._client is not None:
+            if httpx is not None:
+                await self._client.aclose()
+            else:
+                await self._client.close()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
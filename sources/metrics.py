@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Crawl metrics: per-chapter and per-stage timings, bytes and retries
+
+A CrawlMetrics instance is handed to the crawl (iter_crawl_chapters,
+acrawl_all_chapters) and to the EPUB writer. While a chapter is being
+processed its record is the current one for that thread or asyncio task
+(a ContextVar), so code deep in the pipeline (HTTP hooks, the cleaner)
+can report to it through the module-level stage() and record_response()
+without being passed the metrics object.
+
+Stages:
+    fetch       download of the chapter page (whole request)
+    parse       _parse_chapter_page, cleaning included (round trip when
+                parsing runs in a process pool)
+    clean       clean_chapter_content (not measured in parser processes)
+    store       chapter cache/journal lookups and writes
+    retry_wait  backoff sleeps between retries
+    epub_write  rendering and compressing chapters into the EPUB
+
+requests only exposes the time until the response headers arrived
+(Response.elapsed), which is reported as ttfb; DNS and connect times are
+not available through it.
+"""
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STAGES = ('fetch', 'parse', 'clean', 'store', 'retry_wait', 'epub_write')
+
+# (metrics, chapter record) of the chapter being processed in this context
+_current = ContextVar('crawl_metrics_current', default=None)
+
+
+class CrawlMetrics:
+    """Thread-safe collector of crawl metrics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.chapters = []
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.stage_counts = {stage: 0 for stage in STAGES}
+        self.outcomes = {'fetched': 0, 'cache': 0, 'journal': 0, 'failed': 0}
+        self.bytes_downloaded = 0
+        self.ttfb_seconds = 0.0
+        self.responses = 0
+        self.retries = 0
+        self.hedges = 0
+
+    @contextmanager
+    def chapter(self, url):
+        """
+        Make a new chapter record current for the duration of the block
+
+        Yields:
+            The record (dict); set its 'outcome' before leaving the block
+        """
+        record = {'url': url, 'outcome': None, 'retries': 0, 'hedges': 0, 'bytes': 0, 'ttfb': 0.0}
+        # The clock runs again if more chapters come after finish()
+        self.finished_at = None
+        token = _current.set((self, record))
+        try:
+            yield record
+        finally:
+            _current.reset(token)
+            with self.lock:
+                self.chapters.append(record)
+                if record['outcome'] in self.outcomes:
+                    self.outcomes[record['outcome']] += 1
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as stage `name` (and of the current chapter, if any)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def add_stage(self, name, seconds):
+        with self.lock:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+            self.stage_counts[name] = self.stage_counts.get(name, 0) + 1
+        current = _current.get()
+        if current is not None and current[0] is self:
+            record = current[1]
+            record[name] = record.get(name, 0.0) + seconds
+
+    def add_response(self, ttfb, size):
+        with self.lock:
+            self.responses += 1
+            self.ttfb_seconds += ttfb
+            self.bytes_downloaded += size
+        current = _current.get()
+        if current is not None and current[0] is self:
+            current[1]['ttfb'] += ttfb
+            current[1]['bytes'] += size
+
+    def add_retry(self):
+        with self.lock:
+            self.retries += 1
+        current = _current.get()
+        if current is not None and current[0] is self:
+            current[1]['retries'] += 1
+
+    def add_hedge(self):
+        with self.lock:
+            self.hedges += 1
+        current = _current.get()
+        if current is not None and current[0] is self:
+            current[1]['hedges'] += 1
+
+    def finish(self):
+        """Stop the clock used for throughput"""
+        self.finished_at = time.monotonic()
+
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def snapshot(self):
+        """
+        Current totals and throughput, cheap enough to call while crawling
+
+        Returns:
+            dict with chapter counts, bytes, retries, elapsed seconds,
+            chapters/s and MB/s
+        """
+        with self.lock:
+            done = sum(self.outcomes.values())
+            elapsed = self.elapsed()
+            return {
+                'chapters': done,
+                'outcomes': dict(self.outcomes),
+                'bytes': self.bytes_downloaded,
+                'retries': self.retries,
+                'hedges': self.hedges,
+                'elapsed': elapsed,
+                'chapters_per_second': done / elapsed if elapsed > 0 else 0.0,
+                'mb_per_second': self.bytes_downloaded / elapsed / (1024 * 1024) if elapsed > 0 else 0.0,
+            }
+
+    def summary(self):
+        """Snapshot plus per-stage totals and averages"""
+        summary = self.snapshot()
+        with self.lock:
+            summary['stages'] = {
+                name: {
+                    'seconds': self.stage_seconds[name],
+                    'count': self.stage_counts[name],
+                    'average': self.stage_seconds[name] / self.stage_counts[name] if self.stage_counts[name] else 0.0
+                }
+                for name in self.stage_seconds
+            }
+            summary['ttfb_average'] = self.ttfb_seconds / self.responses if self.responses else 0.0
+        return summary
+
+    def to_json(self, include_chapters=True):
+        """Summary (and per-chapter records) as a JSON string"""
+        data = {'summary': self.summary()}
+        if include_chapters:
+            with self.lock:
+                data['chapters'] = list(self.chapters)
+        return json.dumps(data, ensure_ascii=False, indent=1)
+
+    def to_prometheus(self, prefix='novel_crawl'):
+        """Totals in the Prometheus text exposition format"""
+        summary = self.summary()
+        lines = [
+            f'# HELP {prefix}_chapters_total Chapters processed, by outcome',
+            f'# TYPE {prefix}_chapters_total counter',
+        ]
+        for outcome, count in summary['outcomes'].items():
+            lines.append(f'{prefix}_chapters_total{{outcome="{outcome}"}} {count}')
+
+        lines += [
+            f'# HELP {prefix}_stage_seconds_total Time spent in each pipeline stage',
+            f'# TYPE {prefix}_stage_seconds_total counter',
+        ]
+        for name, stage in summary['stages'].items():
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {stage["seconds"]:.6f}')
+
+        lines += [
+            f'# HELP {prefix}_stage_calls_total Number of timed calls of each pipeline stage',
+            f'# TYPE {prefix}_stage_calls_total counter',
+        ]
+        for name, stage in summary['stages'].items():
+            lines.append(f'{prefix}_stage_calls_total{{stage="{name}"}} {stage["count"]}')
+
+        lines += [
+            f'# HELP {prefix}_bytes_total Bytes of chapter pages downloaded',
+            f'# TYPE {prefix}_bytes_total counter',
+            f'{prefix}_bytes_total {summary["bytes"]}',
+            f'# HELP {prefix}_retries_total Chapter request retries',
+            f'# TYPE {prefix}_retries_total counter',
+            f'{prefix}_retries_total {summary["retries"]}',
+            f'# HELP {prefix}_hedges_total Duplicate requests sent for slow chapter requests',
+            f'# TYPE {prefix}_hedges_total counter',
+            f'{prefix}_hedges_total {summary["hedges"]}',
+            f'# HELP {prefix}_ttfb_seconds_average Average time until response headers',
+            f'# TYPE {prefix}_ttfb_seconds_average gauge',
+            f'{prefix}_ttfb_seconds_average {summary["ttfb_average"]:.6f}',
+            f'# HELP {prefix}_elapsed_seconds Wall time of the crawl',
+            f'# TYPE {prefix}_elapsed_seconds gauge',
+            f'{prefix}_elapsed_seconds {summary["elapsed"]:.3f}',
+            f'# HELP {prefix}_chapters_per_second Chapter throughput',
+            f'# TYPE {prefix}_chapters_per_second gauge',
+            f'{prefix}_chapters_per_second {summary["chapters_per_second"]:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """Write the metrics to path: Prometheus text for .prom/.txt, JSON otherwise"""
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus()
+        else:
+            content = self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def print_summary(self):
+        """Print a short human readable summary"""
+        summary = self.summary()
+        outcomes = summary['outcomes']
+        print("\nThống kê:")
+        print(f"  Chương: {outcomes['fetched']} tải mới, {outcomes['cache'] + outcomes['journal']} đã lưu, "
+              f"{outcomes['failed']} lỗi, {summary['retries']} lần thử lại, "
+              f"{summary['hedges']} lần gửi lại request chậm")
+        print(f"  Thời gian: {summary['elapsed']:.1f}s ({summary['chapters_per_second']:.2f} chương/s, "
+              f"{summary['mb_per_second']:.2f} MB/s, TTFB TB {summary['ttfb_average'] * 1000:.0f} ms)")
+        for name, stage in summary['stages'].items():
+            if stage['count']:
+                print(f"  {name:<10}: tổng {stage['seconds']:.2f}s, TB {stage['average'] * 1000:.1f} ms")
+
+
+@contextmanager
+def stage(name):
+    """Time a block into the metrics of the current chapter (no-op without one)"""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    with current[0].stage(name):
+        yield
+
+
+def record_hedge():
+    """Count a hedged request in the metrics of the current chapter, if any"""
+    current = _current.get()
+    if current is not None:
+        current[0].add_hedge()
+
+
+def record_response(ttfb, size):
+    """Report a downloaded response to the metrics of the current chapter, if any"""
+    current = _current.get()
+    if current is not None:
+        current[0].add_response(ttfb, size)
+
+
+def requests_hook(response, *args, **kwargs):
+    """requests response hook reporting TTFB and body size"""
+    if _current.get() is None:
+        return
+    size = 0 if kwargs.get('stream') else len(response.content)
+    record_response(response.elapsed.total_seconds(), size)
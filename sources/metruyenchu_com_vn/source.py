@@ -9,12 +9,17 @@ import re
 import math
 import html
 import time
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
+from concurrent.futures import ThreadPoolExecutor
 
 from sources.base import BaseNovelSource
-from config import DEFAULT_HEADERS, DEFAULT_TIMEOUT, CHAPTERS_PER_PAGE
+from sources.chapter import Chapter, ChapterList
+from sources.parser import make_soup
+from sources.cleaner import clean_chapter_content
+from sources.spec import ExtractionSpec
+from config import DEFAULT_HEADERS, DEFAULT_TIMEOUT, CHAPTERS_PER_PAGE, DEFAULT_CHAPTER_LIST_WORKERS
 
 
 class MetruyenchuComVnSource(BaseNovelSource):
@@ -23,9 +28,146 @@ class MetruyenchuComVnSource(BaseNovelSource):
     name = "metruyenchu.com.vn"
     base_url = "https://metruyenchu.com.vn"
 
+    spec = ExtractionSpec(
+        selectors={
+            'novel_id_input': 'input[name="bid"][type="hidden"]',
+            'title': ('h1[itemprop="name"]', 'h1'),
+            'author': ('a[itemprop="author"]', 'a[href*="/tac-gia/"]'),
+            'description': 'div[itemprop="description"]',
+            'cover': 'img[itemprop="image"]',
+            'chapter_count_label': 'b:-soup-contains("Số chương")',
+            'chapter_links': 'a[href]',
+            'content': ('div.truyen', 'div#chapter-content', 'div.chapter-content', 'div#content'),
+        },
+        patterns={
+            'novel_id': r"var\s+rid\s*=\s*['\"](\d+)['\"]",
+            'number': r'(\d+)',
+            'chapter_count': r'Số chương\s*:\s*(\d+)',
+            # "Số chương" label and number with markup in between, for probe();
+            # the number must be followed by something, or a page cut inside it would match
+            'chapter_count_html': r'Số chương\s*(?:<[^>]+>\s*)*:?\s*(?:<[^>]+>\s*)*(\d+)(?=\D)',
+        }
+    )
+
+    http_cache_skip = re.compile(r'/chuong-\d+/?$')
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
+        self._prepare_session(self.session)
+
+    def _split_novel_url(self, url):
+        """Get base_url and novel_slug from a novel URL"""
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        novel_slug = parsed_url.path.strip('/').split('/')[-1]
+
+        print(f"✓ Base URL: {base_url}")
+        print(f"✓ Novel slug: {novel_slug}")
+        return base_url, novel_slug
+
+    def _parse_novel_page(self, page_html, base_url, novel_slug):
+        """
+        Extract novel information from the novel page HTML
+
+        Args:
+            page_html: HTML of the novel page
+            base_url: Base URL of the site
+            novel_slug: Slug of the novel
+
+        Returns:
+            dict with novel information
+        """
+        soup = make_soup(page_html)
+
+        # Extract novel ID
+        novel_id = None
+        script_match = self.spec.search('novel_id', page_html)
+        if script_match:
+            novel_id = int(script_match.group(1))
+
+        if not novel_id:
+            bid_input = self.spec.select_one(soup, 'novel_id_input')
+            if bid_input and bid_input.get('value'):
+                novel_id = int(bid_input.get('value'))
+
+        if not novel_id:
+            raise ValueError("Không tìm thấy Novel ID trong trang")
+
+        print(f"✓ Novel ID: {novel_id}")
+
+        # Extract title
+        novel_title = ""
+        title_tag = self.spec.select_one(soup, 'title')
+        if title_tag:
+            novel_title = html.unescape(title_tag.get_text(strip=True))
+        else:
+            novel_title = novel_slug.replace('-', ' ').title()
+
+        print(f"✓ Tiêu đề: {novel_title}")
+
+        # Extract author
+        novel_author = ""
+        author_tag = self.spec.select_one(soup, 'author')
+        if author_tag:
+            novel_author = author_tag.get_text(strip=True)
+        else:
+            novel_author = "Không rõ"
+
+        print(f"✓ Tác giả: {novel_author}")
+
+        # Extract description
+        novel_description = ""
+        desc_tag = self.spec.select_one(soup, 'description')
+        if desc_tag:
+            novel_description = desc_tag.get_text(separator='\n', strip=True)
+
+        # Extract cover image URL
+        cover_url = None
+        cover_tag = self.spec.select_one(soup, 'cover')
+        if cover_tag and cover_tag.get('src'):
+            cover_url = cover_tag.get('src')
+            if not cover_url.startswith('http'):
+                cover_url = urljoin(base_url, cover_url)
+
+        # Extract total chapters
+        total_chapters = None
+
+        # Method 1: Find <b> tag containing "Số chương" then get parent <li>
+        chapter_b = self.spec.select_one(soup, 'chapter_count_label')
+        if chapter_b:
+            chapter_li = chapter_b.parent
+            if chapter_li:
+                chapter_text = chapter_li.get_text()
+                chapter_match = self.spec.search('number', chapter_text)
+                if chapter_match:
+                    total_chapters = int(chapter_match.group(1))
+
+        # Method 2: Find any text containing "Số chương :" followed by numbers
+        if not total_chapters:
+            chapter_match = self.spec.search('chapter_count', page_html)
+            if chapter_match:
+                total_chapters = int(chapter_match.group(1))
+
+        if not total_chapters:
+            raise ValueError("Không tìm thấy số chương trong trang")
+
+        print(f"✓ Tổng số chương: {total_chapters}")
+
+        # Calculate max pages
+        max_pages = math.ceil(total_chapters / CHAPTERS_PER_PAGE)
+
+        return {
+            'base_url': base_url,
+            'novel_slug': novel_slug,
+            'novel_id': novel_id,
+            'novel_title': novel_title,
+            'novel_author': novel_author,
+            'novel_description': novel_description,
+            'cover_url': cover_url,
+            'max_pages': max_pages,
+            'total_chapters': total_chapters
+        }
 
     def parse_novel_url(self, url):
         """
@@ -38,195 +180,206 @@ class MetruyenchuComVnSource(BaseNovelSource):
             dict with novel information
         """
         print(f"\nĐang phân tích URL: {url}")
-
-        # Parse URL to get base_url and novel_slug
-        parsed_url = urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-        novel_slug = parsed_url.path.strip('/').split('/')[-1]
-
-        print(f"✓ Base URL: {base_url}")
-        print(f"✓ Novel slug: {novel_slug}")
+        base_url, novel_slug = self._split_novel_url(url)
 
         # Fetch the novel page
         try:
             response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Extract novel ID
-            novel_id = None
-            script_match = re.search(r"var\s+rid\s*=\s*['\"](\d+)['\"]", response.text)
-            if script_match:
-                novel_id = int(script_match.group(1))
-
-            if not novel_id:
-                bid_input = soup.find('input', {'name': 'bid', 'type': 'hidden'})
-                if bid_input and bid_input.get('value'):
-                    novel_id = int(bid_input.get('value'))
-
-            if not novel_id:
-                raise ValueError("Không tìm thấy Novel ID trong trang")
-
-            print(f"✓ Novel ID: {novel_id}")
-
-            # Extract title
-            novel_title = ""
-            title_tag = soup.find('h1', itemprop='name') or soup.find('h1')
-            if title_tag:
-                novel_title = html.unescape(title_tag.get_text(strip=True))
-            else:
-                novel_title = novel_slug.replace('-', ' ').title()
-
-            print(f"✓ Tiêu đề: {novel_title}")
-
-            # Extract author
-            novel_author = ""
-            author_tag = soup.find('a', itemprop='author') or \
-                        soup.find('a', href=re.compile(r'/tac-gia/'))
-            if author_tag:
-                novel_author = author_tag.get_text(strip=True)
-            else:
-                novel_author = "Không rõ"
-
-            print(f"✓ Tác giả: {novel_author}")
-
-            # Extract description
-            novel_description = ""
-            desc_tag = soup.find('div', itemprop='description')
-            if desc_tag:
-                novel_description = desc_tag.get_text(separator='\n', strip=True)
-
-            # Extract cover image
-            cover_image = None
-            cover_tag = soup.find('img', itemprop='image')
-            if cover_tag and cover_tag.get('src'):
-                cover_url = cover_tag.get('src')
-                if not cover_url.startswith('http'):
-                    cover_url = urljoin(base_url, cover_url)
-                try:
-                    print(f"✓ Đang tải ảnh bìa...", end=' ')
-                    cover_response = self.session.get(cover_url, timeout=DEFAULT_TIMEOUT)
-                    cover_response.raise_for_status()
-                    cover_image = cover_response.content
-                    print("✓")
-                except Exception as e:
-                    print(f"✗ ({e})")
-
-            # Extract total chapters
-            total_chapters = None
-
-            # Method 1: Find <b> tag containing "Số chương" then get parent <li>
-            chapter_b = soup.find('b', string=re.compile(r'Số chương'))
-            if chapter_b:
-                chapter_li = chapter_b.parent
-                if chapter_li:
-                    chapter_text = chapter_li.get_text()
-                    chapter_match = re.search(r'(\d+)', chapter_text)
-                    if chapter_match:
-                        total_chapters = int(chapter_match.group(1))
-
-            # Method 2: Find any text containing "Số chương :" followed by numbers
-            if not total_chapters:
-                chapter_match = re.search(r'Số chương\s*:\s*(\d+)', response.text)
-                if chapter_match:
-                    total_chapters = int(chapter_match.group(1))
+            novel_info = self._parse_novel_page(response.text, base_url, novel_slug)
+            novel_info['novel_url'] = url
 
-            if not total_chapters:
-                raise ValueError("Không tìm thấy số chương trong trang")
+            return novel_info
 
-            print(f"✓ Tổng số chương: {total_chapters}")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Lỗi khi tải trang: {e}")
+        except Exception as e:
+            raise Exception(f"Lỗi khi phân tích trang: {e}")
 
-            # Calculate max pages
-            max_pages = math.ceil(total_chapters / CHAPTERS_PER_PAGE)
+    async def aparse_novel_url(self, url):
+        """Async version of parse_novel_url"""
+        print(f"\nĐang phân tích URL: {url}")
+        base_url, novel_slug = self._split_novel_url(url)
 
-            return {
-                'base_url': base_url,
-                'novel_slug': novel_slug,
-                'novel_id': novel_id,
-                'novel_title': novel_title,
-                'novel_author': novel_author,
-                'novel_description': novel_description,
-                'cover_image': cover_image,
-                'max_pages': max_pages,
-                'total_chapters': total_chapters
-            }
+        try:
+            response = await self.async_client.get(url, cache=self.http_cache)
+            response.raise_for_status()
+
+            novel_info = self._parse_novel_page(response.text, base_url, novel_slug)
+            novel_info['novel_url'] = url
+
+            return novel_info
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Lỗi khi tải trang: {e}")
         except Exception as e:
             raise Exception(f"Lỗi khi phân tích trang: {e}")
 
+    def probe(self, url):
+        """
+        Cheap check of the current chapter count
+
+        Reads the novel page only up to the chapter count, without parsing
+        it or downloading the cover, then the last listchap page for the
+        latest chapter slug.
+
+        Args:
+            url: Full URL of the novel page
+
+        Returns:
+            dict: {'total_chapters': int, 'latest_slug': str or None}
+        """
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        def extract(page_html):
+            novel_id = self.spec.search('novel_id', page_html)
+            chapter_count = self.spec.search('chapter_count_html', page_html)
+            if novel_id and chapter_count:
+                return int(novel_id.group(1)), int(chapter_count.group(1))
+            return None
+
+        found = self._read_until(url, extract)
+        if found is None:
+            # Unusual page layout, do it the slow way
+            return super().probe(url)
+
+        novel_id, total_chapters = found
+        last_page = max(1, math.ceil(total_chapters / CHAPTERS_PER_PAGE))
+        page_chapters = self._fetch_chapter_list_page(base_url, novel_id, last_page)
+        return {
+            'total_chapters': total_chapters,
+            'latest_slug': page_chapters[-1].slug if page_chapters else None
+        }
+
+    def _parse_chapter_list_page(self, data, base_url):
+        """
+        Extract chapters from one listchap JSON page
+
+        Args:
+            data: Decoded JSON of /get/listchap/{novel_id}?page=N
+            base_url: Base URL of the site
+
+        Returns:
+            List of Chapter records, or None when the page is empty
+        """
+        # Check if there is data
+        if not data.get('data'):
+            return None
+
+        # Unescape HTML entities
+        html_content = html.unescape(data['data'])
+        soup = make_soup(html_content)
+
+        # Find all chapter links
+        links = self.spec.select(soup, 'chapter_links')
+
+        if not links:
+            return None
+
+        page_chapters = []
+        for link in links:
+            href = link.get('href', '')
+
+            # Only get chapter links with correct pattern
+            if not href or 'javascript:' in href:
+                continue
+
+            # Check if href contains 'chuong-' pattern
+            if '/chuong-' not in href.lower():
+                continue
+
+            page_chapters.append(Chapter(
+                title=link.get_text(strip=True),
+                url=urljoin(base_url, href),
+                slug=href.split('/')[-1] if '/' in href else href
+            ))
+
+        return page_chapters
+
+    def _fetch_chapter_list_page(self, base_url, novel_id, page):
+        """Fetch and parse one listchap page, None when the page is empty"""
+        url = f"{base_url}/get/listchap/{novel_id}?page={page}"
+        response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return self._parse_chapter_list_page(response.json(), base_url)
+
+    def _chapter_url_template(self, novel_info):
+        """URL template of the novel's chapters, for ChapterList"""
+        return f"{novel_info['base_url']}/{novel_info['novel_slug']}/{{slug}}"
+
+    def _merge_chapter_list_pages(self, results, url_template):
+        """
+        Merge concurrently fetched listchap pages in page order
+
+        Stops at the first failed or empty page, like the sequential walk.
+
+        Args:
+            results: List of (page, chapters or None, error or None), in page order
+            url_template: URL template of the novel's chapters
+
+        Returns:
+            ChapterList
+        """
+        chapters = ChapterList(url_template)
+        for page, page_chapters, error in results:
+            if error:
+                print(f"\n✗ Lỗi khi lấy trang {page}: {error}")
+                break
+            if not page_chapters:
+                print(f"  Trang {page}... (Hết)")
+                break
+            chapters.extend(page_chapters)
+            print(f"  Trang {page}... ✓ Tìm thấy {len(page_chapters)} chương")
+        return chapters
+
     def get_chapter_list(self, novel_info, delay=0.5):
         """
         Fetch list of all chapters
 
+        When the number of pages is known (max_pages), all pages are fetched
+        concurrently (at most DEFAULT_CHAPTER_LIST_WORKERS at a time) and
+        merged in page order. Otherwise pages are walked one by one.
+
         Args:
             novel_info: Dict containing novel information from parse_novel_url
-            delay: Delay time between requests (seconds)
+            delay: Delay time between requests (seconds), used when walking pages one by one
 
         Returns:
-            List of dicts containing chapter information
+            ChapterList of the novel's chapters
         """
-        chapters = []
-        page = 1
         base_url = novel_info['base_url']
         novel_id = novel_info['novel_id']
         max_pages = novel_info.get('max_pages')
 
         if max_pages:
             print(f"\nĐang lấy danh sách chương ({max_pages} trang)...")
-        else:
-            print("\nĐang lấy danh sách chương...")
 
-        while True:
-            # Check if reached max pages
-            if max_pages and page > max_pages:
-                print(f"(Đã đạt giới hạn {max_pages} trang)")
-                break
-            try:
-                url = f"{base_url}/get/listchap/{novel_id}?page={page}"
-                print(f"  Trang {page}...", end=' ')
+            def fetch(page):
+                try:
+                    return page, self._fetch_chapter_list_page(base_url, novel_id, page), None
+                except Exception as e:
+                    return page, None, e
 
-                response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
-                response.raise_for_status()
-                data = response.json()
+            with ThreadPoolExecutor(max_workers=DEFAULT_CHAPTER_LIST_WORKERS) as executor:
+                results = list(executor.map(fetch, range(1, max_pages + 1)))
 
-                # Check if there is data
-                if not data.get('data'):
-                    print("(Hết)")
-                    break
+            chapters = self._merge_chapter_list_pages(results, self._chapter_url_template(novel_info))
+            print(f"\n✓ Tổng cộng tìm thấy {len(chapters)} chương")
+            return chapters
 
-                # Unescape HTML entities
-                html_content = html.unescape(data['data'])
-                soup = BeautifulSoup(html_content, 'html.parser')
+        print("\nĐang lấy danh sách chương...")
+        chapters = ChapterList(self._chapter_url_template(novel_info))
+        page = 1
 
-                # Find all chapter links
-                links = soup.find_all('a', href=True)
+        while True:
+            try:
+                print(f"  Trang {page}...", end=' ')
+                page_chapters = self._fetch_chapter_list_page(base_url, novel_id, page)
 
-                if not links:
+                if not page_chapters:
                     print("(Hết)")
                     break
 
-                page_chapters = []
-                for link in links:
-                    href = link.get('href', '')
-
-                    # Only get chapter links with correct pattern
-                    if not href or 'javascript:' in href:
-                        continue
-
-                    # Check if href contains 'chuong-' pattern
-                    if '/chuong-' not in href.lower():
-                        continue
-
-                    chapter_info = {
-                        'title': link.get_text(strip=True),
-                        'url': urljoin(base_url, href),
-                        'slug': href.split('/')[-1] if '/' in href else href
-                    }
-                    page_chapters.append(chapter_info)
-
                 chapters.extend(page_chapters)
                 print(f"✓ Tìm thấy {len(page_chapters)} chương")
 
@@ -243,53 +396,105 @@ class MetruyenchuComVnSource(BaseNovelSource):
         print(f"\n✓ Tổng cộng tìm thấy {len(chapters)} chương")
         return chapters
 
-    def get_chapter_content(self, chapter_url):
+    async def _afetch_chapter_list_page(self, base_url, novel_id, page):
+        """Async version of _fetch_chapter_list_page"""
+        url = f"{base_url}/get/listchap/{novel_id}?page={page}"
+        response = await self.async_client.get(url, cache=self.http_cache)
+        response.raise_for_status()
+        return self._parse_chapter_list_page(response.json(), base_url)
+
+    async def aget_chapter_list(self, novel_info, delay=0.5):
+        """Async version of get_chapter_list"""
+        base_url = novel_info['base_url']
+        novel_id = novel_info['novel_id']
+        max_pages = novel_info.get('max_pages')
+
+        print("\nĐang lấy danh sách chương...")
+        url_template = self._chapter_url_template(novel_info)
+
+        if max_pages:
+            semaphore = asyncio.Semaphore(DEFAULT_CHAPTER_LIST_WORKERS)
+
+            async def fetch(page):
+                try:
+                    async with semaphore:
+                        return page, await self._afetch_chapter_list_page(base_url, novel_id, page), None
+                except Exception as e:
+                    return page, None, e
+
+            results = await asyncio.gather(*(fetch(page) for page in range(1, max_pages + 1)))
+            chapters = self._merge_chapter_list_pages(results, url_template)
+            print(f"✓ Tổng cộng tìm thấy {len(chapters)} chương")
+            return chapters
+
+        chapters = ChapterList(url_template)
+        page = 1
+
+        while True:
+            try:
+                page_chapters = await self._afetch_chapter_list_page(base_url, novel_id, page)
+
+                if not page_chapters:
+                    break
+
+                chapters.extend(page_chapters)
+                page += 1
+                await asyncio.sleep(delay)
+
+            except Exception as e:
+                print(f"\n✗ Lỗi khi lấy trang {page}: {e}")
+                break
+
+        print(f"✓ Tổng cộng tìm thấy {len(chapters)} chương")
+        return chapters
+
+    def _parse_chapter_page(self, page_html):
         """
-        Fetch content of a chapter
+        Extract cleaned content from a chapter page
 
         Args:
-            chapter_url: URL of the chapter
+            page_html: HTML of the chapter page
 
         Returns:
-            String containing chapter content (HTML)
+            Tuple (chapter title or None, content HTML). The title is not
+            read from the page for this source.
         """
-        response = self.session.get(chapter_url, timeout=DEFAULT_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(page_html)
 
         # Find div containing content - in order of priority
-        content_div = soup.find('div', class_='truyen') or \
-                     soup.find('div', id='chapter-content') or \
-                     soup.find('div', class_='chapter-content') or \
-                     soup.find('div', id='content')
+        content_div = self.spec.select_one(soup, 'content')
 
         if not content_div:
             raise ValueError("Không tìm thấy nội dung chương")
 
-        # Clean content
-        # Remove script, style tags
-        for tag in content_div.find_all(['script', 'style']):
-            tag.decompose()
-
-        # Remove comments and ads if any
-        for tag in content_div.find_all(['iframe', 'ins']):
-            tag.decompose()
-
-        # Get HTML content
-        content_html = str(content_div)
-
-        # Process <br> tags to create paragraphs
-        # Convert consecutive <br> to </p><p>
-        content_html = re.sub(r'(<br\s*/?>){2,}', '</p><p>', content_html, flags=re.IGNORECASE)
-        # Convert single <br> to </p><p>
-        content_html = re.sub(r'<br\s*/?>', '</p><p>', content_html, flags=re.IGNORECASE)
-
-        # Wrap in div and ensure p tags exist
-        if '<p>' not in content_html.lower():
-            # If no p tag, wrap text in p
-            soup_content = BeautifulSoup(content_html, 'html.parser')
-            text_content = soup_content.get_text()
-            paragraphs = [f"<p>{para.strip()}</p>" for para in text_content.split('\n') if para.strip()]
-            content_html = '\n'.join(paragraphs)
-
-        return f"<div>{content_html}</div>"
+        return None, clean_chapter_content(content_div)
+
+    def _fetch_chapter_page(self, chapter_url):
+        """Download a chapter page"""
+        response = self.session.get(chapter_url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+
+    async def _afetch_chapter_page(self, chapter_url):
+        """Async version of _fetch_chapter_page"""
+        response = await self.async_client.get(chapter_url)
+        response.raise_for_status()
+        return response.text
+
+    def get_chapter_content(self, chapter_url):
+        """
+        Fetch content of a chapter
+
+        Args:
+            chapter_url: URL of the chapter
+
+        Returns:
+            String containing chapter content (HTML)
+        """
+        _, content = self._parse_chapter_page(self._fetch_chapter_page(chapter_url))
+        return content
+
+    async def aget_chapter_content(self, chapter_url):
+        """Async version of get_chapter_content"""
+        _, content = self._parse_chapter_page(await self._afetch_chapter_page(chapter_url))
+        return content
@@ -8,13 +8,24 @@ Source implementation for metruyenhot.me
 import re
 import html
 import time
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 
 from sources.base import BaseNovelSource
+from sources.rate_limiter import default_rate_limiter, response_info, backoff_delay
+from sources.chapter import ChapterRange
+from sources.parser import make_soup
+from sources.cleaner import clean_chapter_content
+from sources.spec import ExtractionSpec
 from config import DEFAULT_HEADERS, DEFAULT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_DELAY_BETWEEN_REQUESTS
 
+# Upper bound for _discover_total_chapters, against servers that answer 200 for any URL
+MAX_CHAPTER_NUMBER = 1000000
+
+# Redirects followed by _chapter_exists (http to https, canonical host...)
+MAX_PROBE_REDIRECTS = 5
+
 
 class MetruyenhotMeSource(BaseNovelSource):
     """Source implementation for metruyenhot.me"""
@@ -22,9 +33,312 @@ class MetruyenhotMeSource(BaseNovelSource):
     name = "metruyenhot.me"
     base_url = "https://metruyenhot.me"
 
+    spec = ExtractionSpec(
+        selectors={
+            'title': ('.wrap-detail h1.title a', 'h1.title'),
+            'author': 'span[itemprop="author"]',
+            'description': 'span[itemprop="description"]',
+            'description_fallback': '.content1',
+            'cover': '.wrap-detail img[data-src]',
+            'pagination': '.pagination',
+            'chapter_title': '.rv-chapt-title h2 a',
+            'content': ('.chapter-c', '.book-list.full-story.content.chapter-c', '#j_content'),
+        },
+        patterns={
+            'latest_heading': (r'Chương Mới Nhất', re.I),
+            # First chapter link after the "Chương Mới Nhất" heading, for probe();
+            # the number must be followed by something, or a page cut inside it would match
+            'latest_chapter_html': (r'<h3[^>]*>\s*Chương Mới Nhất\s*</h3>.*?/chuong-(\d+)(?=\D)', re.I | re.S),
+            'chapter_href': r'/chuong-\d+',
+            'chapter_number': r'/chuong-(\d+)',
+            'any_chapter': (r'chuong-(\d+)', re.I),
+            'page_href': r'\?page=\d+',
+            'page_number': r'\?page=(\d+)',
+            'story_id': r'storyId["\s:=]+["\']?(\d+)',
+        }
+    )
+
+    http_cache_skip = re.compile(r'/chuong-\d+/?$')
+
+    failure_placeholder = "<p>Lỗi khi tải chương sau {attempts} lần thử: {error}</p>"
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
+        self._prepare_session(self.session)
+
+    def _split_novel_url(self, url):
+        """Get base_url and novel_slug from a novel URL"""
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        novel_slug = parsed_url.path.strip('/').split('/')[-1]
+
+        print(f"✓ Base URL: {base_url}")
+        print(f"✓ Novel slug: {novel_slug}")
+        return base_url, novel_slug
+
+    def _parse_novel_page(self, page_html, base_url, novel_slug):
+        """
+        Extract novel information from the novel page HTML
+
+        Args:
+            page_html: HTML of the novel page
+            base_url: Base URL of the site
+            novel_slug: Slug of the novel
+
+        Returns:
+            dict with novel information; 'total_chapters' is None when the
+            page has no "Chương Mới Nhất" block and only 'chapter_hint'
+            (an estimate) is known
+        """
+        soup = make_soup(page_html)
+
+        # Extract title from h1.title or .wrap-detail h1
+        novel_title = ""
+        title_tag = self.spec.select_one(soup, 'title')
+        if title_tag:
+            novel_title = html.unescape(title_tag.get_text(strip=True))
+        else:
+            novel_title = novel_slug.replace('-', ' ').title()
+
+        print(f"✓ Tiêu đề: {novel_title}")
+
+        # Extract author from span[itemprop="author"]
+        novel_author = ""
+        author_tag = self.spec.select_one(soup, 'author')
+        if author_tag:
+            novel_author = author_tag.get_text(strip=True)
+        else:
+            novel_author = "Không rõ"
+
+        print(f"✓ Tác giả: {novel_author}")
+
+        # Extract description from span[itemprop="description"]
+        novel_description = ""
+        desc_tag = self.spec.select_one(soup, 'description')
+        if desc_tag:
+            novel_description = desc_tag.get_text(separator='\n', strip=True)
+        else:
+            # Try to get from .content1
+            desc_div = self.spec.select_one(soup, 'description_fallback')
+            if desc_div:
+                novel_description = desc_div.get_text(separator='\n', strip=True)[:500]
+
+        # Extract cover image URL from .wrap-detail img[data-src]
+        cover_url = None
+        cover_tag = self.spec.select_one(soup, 'cover')
+        if cover_tag and cover_tag.get('data-src'):
+            cover_url = cover_tag.get('data-src')
+            if not cover_url.startswith('http'):
+                cover_url = urljoin(base_url, cover_url)
+
+        # Extract total chapters from "Chuong Moi Nhat" section
+        # Find the first link in that section with pattern /novel-slug/chuong-XXX/
+        total_chapters = None
+
+        # Method 1: Find link in "Chuong Moi Nhat" section
+        latest_section = soup.find('h3', string=self.spec.pattern('latest_heading'))
+        if latest_section:
+            parent = latest_section.find_parent('div', class_='row') or latest_section.find_parent('div')
+            if parent:
+                links = parent.find_all('a', href=self.spec.pattern('chapter_href'))
+                if links:
+                    # Get the first link which should be the latest chapter
+                    href = links[0].get('href', '')
+                    chapter_match = self.spec.search('chapter_number', href)
+                    if chapter_match:
+                        total_chapters = int(chapter_match.group(1))
+
+        # Otherwise estimate it from the page. The estimate is only used as
+        # the starting point of _discover_total_chapters.
+        chapter_hint = None
+
+        # Method 2: Find from pagination - look for the last page number
+        if not total_chapters:
+            pagination = self.spec.select_one(soup, 'pagination')
+            if pagination:
+                # Find all links with page numbers
+                page_links = pagination.find_all('a', href=self.spec.pattern('page_href'))
+                max_page = 1
+                for link in page_links:
+                    page_match = self.spec.search('page_number', link.get('href', ''))
+                    if page_match:
+                        page_num = int(page_match.group(1))
+                        if page_num > max_page:
+                            max_page = page_num
+                # Each page has ~50 chapters, estimate total
+                if max_page > 1:
+                    chapter_hint = max_page * 50  # Rough estimate
+
+        # Method 3: Search in page text
+        if not total_chapters and not chapter_hint:
+            chapter_match = self.spec.search('any_chapter', page_html)
+            if chapter_match:
+                # Find highest chapter number in page
+                all_chapters = self.spec.pattern('chapter_number').findall(page_html)
+                if all_chapters:
+                    chapter_hint = max(int(c) for c in all_chapters)
+
+        if total_chapters:
+            print(f"✓ Tổng số chương: {total_chapters}")
+
+        # Extract novel_id if available (from hidden input or script)
+        novel_id = None
+        # Try to find story_id in page
+        story_id_match = self.spec.search('story_id', page_html)
+        if story_id_match:
+            novel_id = int(story_id_match.group(1))
+        else:
+            # Use slug hash as ID
+            novel_id = hash(novel_slug) % 100000
+
+        return {
+            'base_url': base_url,
+            'novel_slug': novel_slug,
+            'novel_id': novel_id,
+            'novel_title': novel_title,
+            'novel_author': novel_author,
+            'novel_description': novel_description,
+            'cover_url': cover_url,
+            'max_pages': None,  # Will be calculated during chapter list fetch
+            'total_chapters': total_chapters,
+            'chapter_hint': chapter_hint
+        }
+
+    def _probe_status(self, url):
+        """
+        Status code of url without downloading the body, and where it redirects to
+
+        Sends a HEAD request. Servers that refuse HEAD get a streamed GET
+        that is closed as soon as the status line is read. The request is
+        paced by the shared rate limiter and retried with backoff on
+        429/5xx and connection errors.
+
+        Returns:
+            Tuple (status code, absolute Location or None)
+        """
+        for attempt in range(1, DEFAULT_MAX_RETRIES + 1):
+            default_rate_limiter.acquire(url)
+            started = time.monotonic()
+            try:
+                response = self.session.head(url, timeout=DEFAULT_TIMEOUT, allow_redirects=False)
+                if response.status_code in (405, 501):
+                    with self.session.get(url, timeout=DEFAULT_TIMEOUT, stream=True,
+                                          allow_redirects=False) as response:
+                        pass
+                if response.status_code == 429 or response.status_code >= 500:
+                    response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                status_code, retry_after = response_info(e)
+                default_rate_limiter.release(url, time.monotonic() - started, status_code, retry_after,
+                                             error=True)
+                if attempt == DEFAULT_MAX_RETRIES:
+                    raise
+                time.sleep(backoff_delay(attempt, DEFAULT_DELAY_BETWEEN_REQUESTS, retry_after))
+                continue
+
+            default_rate_limiter.release(url, time.monotonic() - started)
+            location = response.headers.get('Location')
+            return response.status_code, urljoin(url, location) if location else None
+
+    def _chapter_exists(self, base_url, novel_slug, number):
+        """
+        Check whether /novel-slug/chuong-N/ exists without downloading it
+
+        A missing chapter is either a 404/410 or a redirect back to the
+        novel page (any page that is not a chapter). Other redirects (http
+        to https, canonical host, trailing slash) are followed.
+        """
+        url = f"{base_url}/{novel_slug}/chuong-{number}/"
+        for _ in range(MAX_PROBE_REDIRECTS + 1):
+            status_code, location = self._probe_status(url)
+            if status_code in (404, 410):
+                return False
+            if not 300 <= status_code < 400:
+                if status_code >= 400:
+                    raise requests.exceptions.HTTPError(f"{status_code} Error for url: {url}")
+                return True
+            if location is None:
+                return False
+            if not self.spec.search('chapter_number', urlparse(location).path):
+                return False
+            url = location
+        raise ValueError(f"Quá nhiều lần chuyển hướng: {url}")
+
+    def _discover_total_chapters(self, base_url, novel_slug, hint=None):
+        """
+        Find the number of the last chapter by probing chapter URLs
+
+        Gallops up (steps of 1, 2, 4...) from the hint until a chapter is
+        missing, then binary searches between the last chapter found and
+        the first missing one, so it takes O(log N) requests. When the hint
+        is exact, two requests are enough (hint + 1 missing, hint there).
+        Chapters are assumed to be numbered from 1 without gaps.
+
+        Args:
+            base_url: Base URL of the site
+            novel_slug: Slug of the novel
+            hint: Estimated number of chapters to start from (optional)
+
+        Returns:
+            Tuple (number of the last chapter or 0, number of requests sent)
+        """
+        requests_sent = 0
+
+        def exists(number):
+            nonlocal requests_sent
+            requests_sent += 1
+            return self._chapter_exists(base_url, novel_slug, number)
+
+        found = 0
+        missing = None
+        if hint and hint > 0:
+            if exists(hint + 1):
+                found = hint + 1
+            elif exists(hint):
+                return hint, requests_sent
+            else:
+                missing = hint
+        elif exists(1):
+            found = 1
+        else:
+            return 0, requests_sent
+
+        step = 1
+        while missing is None:
+            if found >= MAX_CHAPTER_NUMBER:
+                raise ValueError("Mọi số chương đều tồn tại, không xác định được số chương")
+            if exists(found + step):
+                found += step
+                step *= 2
+            else:
+                missing = found + step
+
+        while missing - found > 1:
+            middle = (found + missing) // 2
+            if exists(middle):
+                found = middle
+            else:
+                missing = middle
+
+        return found, requests_sent
+
+    def _resolve_total_chapters(self, novel_info):
+        """Find total_chapters by probing when the novel page did not give it"""
+        hint = novel_info.pop('chapter_hint', None)
+        if novel_info['total_chapters']:
+            return novel_info
+
+        print("  Không thấy mục Chương Mới Nhất, đang dò số chương...")
+        total_chapters, requests_sent = self._discover_total_chapters(
+            novel_info['base_url'], novel_info['novel_slug'], hint
+        )
+        if not total_chapters:
+            raise ValueError("Không tìm thấy số chương trong trang")
+
+        print(f"✓ Tổng số chương: {total_chapters} ({requests_sent} request)")
+        novel_info['total_chapters'] = total_chapters
+        return novel_info
 
     def parse_novel_url(self, url):
         """
@@ -37,321 +351,155 @@ class MetruyenhotMeSource(BaseNovelSource):
             dict with novel information
         """
         print(f"\nĐang phân tích URL: {url}")
-
-        # Parse URL to get base_url and novel_slug
-        parsed_url = urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-        novel_slug = parsed_url.path.strip('/').split('/')[-1]
-
-        print(f"✓ Base URL: {base_url}")
-        print(f"✓ Novel slug: {novel_slug}")
+        base_url, novel_slug = self._split_novel_url(url)
 
         # Fetch the novel page
         try:
             response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            novel_info = self._parse_novel_page(response.text, base_url, novel_slug)
+            self._resolve_total_chapters(novel_info)
+            novel_info['novel_url'] = url
 
-            # Extract title from h1.title or .wrap-detail h1
-            novel_title = ""
-            title_tag = soup.select_one('.wrap-detail h1.title a')
-            if title_tag:
-                novel_title = html.unescape(title_tag.get_text(strip=True))
-            else:
-                title_tag = soup.select_one('h1.title')
-                if title_tag:
-                    novel_title = html.unescape(title_tag.get_text(strip=True))
-                else:
-                    novel_title = novel_slug.replace('-', ' ').title()
-
-            print(f"✓ Tiêu đề: {novel_title}")
-
-            # Extract author from span[itemprop="author"]
-            novel_author = ""
-            author_tag = soup.select_one('span[itemprop="author"]')
-            if author_tag:
-                novel_author = author_tag.get_text(strip=True)
-            else:
-                novel_author = "Không rõ"
+            return novel_info
 
-            print(f"✓ Tác giả: {novel_author}")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Lỗi khi tải trang: {e}")
+        except Exception as e:
+            raise Exception(f"Lỗi khi phân tích trang: {e}")
 
-            # Extract description from span[itemprop="description"]
-            novel_description = ""
-            desc_tag = soup.select_one('span[itemprop="description"]')
-            if desc_tag:
-                novel_description = desc_tag.get_text(separator='\n', strip=True)
-            else:
-                # Try to get from .content1
-                desc_div = soup.select_one('.content1')
-                if desc_div:
-                    novel_description = desc_div.get_text(separator='\n', strip=True)[:500]
-
-            # Extract cover image from .wrap-detail img[data-src]
-            cover_image = None
-            cover_tag = soup.select_one('.wrap-detail img[data-src]')
-            if cover_tag and cover_tag.get('data-src'):
-                cover_url = cover_tag.get('data-src')
-                if not cover_url.startswith('http'):
-                    cover_url = urljoin(base_url, cover_url)
-                try:
-                    print(f"✓ Đang tải ảnh bìa...", end=' ')
-                    cover_response = self.session.get(cover_url, timeout=DEFAULT_TIMEOUT)
-                    cover_response.raise_for_status()
-                    cover_image = cover_response.content
-                    print("✓")
-                except Exception as e:
-                    print(f"✗ ({e})")
-
-            # Extract total chapters from "Chuong Moi Nhat" section
-            # Find the first link in that section with pattern /novel-slug/chuong-XXX/
-            total_chapters = None
-
-            # Method 1: Find link in "Chuong Moi Nhat" section
-            latest_section = soup.find('h3', string=re.compile(r'Chương Mới Nhất', re.I))
-            if latest_section:
-                parent = latest_section.find_parent('div', class_='row') or latest_section.find_parent('div')
-                if parent:
-                    links = parent.find_all('a', href=re.compile(r'/chuong-\d+'))
-                    if links:
-                        # Get the first link which should be the latest chapter
-                        href = links[0].get('href', '')
-                        chapter_match = re.search(r'/chuong-(\d+)', href)
-                        if chapter_match:
-                            total_chapters = int(chapter_match.group(1))
-
-            # Method 2: Find from pagination - look for the last page number
-            if not total_chapters:
-                pagination = soup.select_one('.pagination')
-                if pagination:
-                    # Find all links with page numbers
-                    page_links = pagination.find_all('a', href=re.compile(r'\?page=\d+'))
-                    max_page = 1
-                    for link in page_links:
-                        page_match = re.search(r'\?page=(\d+)', link.get('href', ''))
-                        if page_match:
-                            page_num = int(page_match.group(1))
-                            if page_num > max_page:
-                                max_page = page_num
-                    # Each page has ~50 chapters, estimate total
-                    if max_page > 1:
-                        total_chapters = max_page * 50  # Rough estimate
-
-            # Method 3: Search in page text
-            if not total_chapters:
-                chapter_match = re.search(r'chuong-(\d+)', response.text, re.I)
-                if chapter_match:
-                    # Find highest chapter number in page
-                    all_chapters = re.findall(r'/chuong-(\d+)', response.text)
-                    if all_chapters:
-                        total_chapters = max(int(c) for c in all_chapters)
-
-            if not total_chapters:
-                raise ValueError("Không tìm thấy số chương trong trang")
+    async def aparse_novel_url(self, url):
+        """Async version of parse_novel_url"""
+        print(f"\nĐang phân tích URL: {url}")
+        base_url, novel_slug = self._split_novel_url(url)
 
-            print(f"✓ Tổng số chương: {total_chapters}")
+        try:
+            response = await self.async_client.get(url, cache=self.http_cache)
+            response.raise_for_status()
 
-            # Extract novel_id if available (from hidden input or script)
-            novel_id = None
-            # Try to find story_id in page
-            story_id_match = re.search(r'storyId["\s:=]+["\']?(\d+)', response.text)
-            if story_id_match:
-                novel_id = int(story_id_match.group(1))
-            else:
-                # Use slug hash as ID
-                novel_id = hash(novel_slug) % 100000
-
-            return {
-                'base_url': base_url,
-                'novel_slug': novel_slug,
-                'novel_id': novel_id,
-                'novel_title': novel_title,
-                'novel_author': novel_author,
-                'novel_description': novel_description,
-                'cover_image': cover_image,
-                'max_pages': None,  # Will be calculated during chapter list fetch
-                'total_chapters': total_chapters
-            }
+            novel_info = self._parse_novel_page(response.text, base_url, novel_slug)
+            await asyncio.to_thread(self._resolve_total_chapters, novel_info)
+            novel_info['novel_url'] = url
+
+            return novel_info
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Lỗi khi tải trang: {e}")
         except Exception as e:
             raise Exception(f"Lỗi khi phân tích trang: {e}")
 
+    def novel_url_for_slug(self, novel_slug):
+        return f"{self.base_url}/{novel_slug}/"
+
+    def probe(self, url):
+        """
+        Cheap check of the current chapter count
+
+        Reads the novel page only up to the first link of the "Chương Mới
+        Nhất" block, without parsing it or downloading the cover.
+
+        Args:
+            url: Full URL of the novel page
+
+        Returns:
+            dict: {'total_chapters': int, 'latest_slug': str or None}
+        """
+        def extract(page_html):
+            latest = self.spec.search('latest_chapter_html', page_html)
+            return int(latest.group(1)) if latest else None
+
+        total_chapters = self._read_until(url, extract)
+        if total_chapters is None:
+            # No "Chương Mới Nhất" block, look for the last chapter directly
+            parsed_url = urlparse(url)
+            total_chapters, _ = self._discover_total_chapters(
+                f"{parsed_url.scheme}://{parsed_url.netloc}", parsed_url.path.strip('/').split('/')[-1]
+            )
+
+        return {
+            'total_chapters': total_chapters,
+            'latest_slug': f"chuong-{total_chapters}" if total_chapters else None
+        }
+
     def get_chapter_list(self, novel_info, delay=0.5):
         """
-        Fetch list of all chapters
+        Build the list of all chapters
 
         For metruyenhot.me, chapters are numbered sequentially from 1 to total_chapters.
         URL pattern: /novel-slug/chuong-X/
+        The list is a lazy ChapterRange: nothing is requested or built
+        until a chapter is read.
 
         Args:
             novel_info: Dict containing novel information from parse_novel_url
-            delay: Delay time between requests (seconds)
+            delay: Unused, no request is needed
 
         Returns:
-            List of dicts containing chapter information
+            ChapterRange of the novel's chapters
         """
-        chapters = []
         base_url = novel_info['base_url']
         novel_slug = novel_info['novel_slug']
         total_chapters = novel_info['total_chapters']
 
-        print(f"\nĐang tạo danh sách {total_chapters} chương...")
-
-        # For metruyenhot.me, we can generate chapter URLs directly
-        # since they follow pattern: /novel-slug/chuong-X/
-        for i in range(1, total_chapters + 1):
-            chapter_url = f"{base_url}/{novel_slug}/chuong-{i}/"
-            chapter_info = {
-                'title': f"Chương {i}",
-                'url': chapter_url,
-                'slug': f"chuong-{i}"
-            }
-            chapters.append(chapter_info)
-
-        print(f"✓ Tổng cộng {len(chapters)} chương")
+        chapters = ChapterRange(f"{base_url}/{novel_slug}/{{slug}}/", range(1, total_chapters + 1))
+        print(f"\n✓ Tổng cộng {len(chapters)} chương")
         return chapters
 
-    def get_chapter_content(self, chapter_url):
+    async def aget_chapter_list(self, novel_info, delay=0.5):
+        """Async version of get_chapter_list (no request is needed)"""
+        return self.get_chapter_list(novel_info, delay)
+
+    def _parse_chapter_page(self, page_html):
         """
-        Fetch content of a chapter
+        Extract title and cleaned content from a chapter page
 
         Args:
-            chapter_url: URL of the chapter
+            page_html: HTML of the chapter page
 
         Returns:
-            String containing chapter content (HTML)
+            Tuple (chapter title or None, content HTML)
         """
-        response = self.session.get(chapter_url, timeout=DEFAULT_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(page_html)
 
-        # Update chapter title from page
-        title_tag = soup.select_one('.rv-chapt-title h2 a')
+        # Chapter title from page
+        chapter_title = None
+        title_tag = self.spec.select_one(soup, 'chapter_title')
         if title_tag:
             chapter_title = title_tag.get_text(strip=True)
 
         # Find content div - priority order
-        content_div = soup.select_one('.chapter-c') or \
-                     soup.select_one('.book-list.full-story.content.chapter-c') or \
-                     soup.select_one('#j_content')
+        content_div = self.spec.select_one(soup, 'content')
 
         if not content_div:
             raise ValueError("Không tìm thấy nội dung chương")
 
-        # Clean content
-        # Remove script, style tags
-        for tag in content_div.find_all(['script', 'style', 'ins', 'iframe']):
-            tag.decompose()
-
-        # Remove ads divs
-        for tag in content_div.find_all('div', id=re.compile(r'ads|banner', re.I)):
-            tag.decompose()
-        for tag in content_div.find_all('div', class_=re.compile(r'ads|banner', re.I)):
-            tag.decompose()
-
-        # Get all paragraph content
-        paragraphs = content_div.find_all('p')
-        if paragraphs:
-            content_parts = []
-            for p in paragraphs:
-                p_html = str(p)
-                # Convert <br> to paragraph breaks
-                p_html = re.sub(r'<br\s*/?>\s*<br\s*/?>', '</p><p>', p_html, flags=re.I)
-                p_html = re.sub(r'<br\s*/?>', '</p><p>', p_html, flags=re.I)
-                content_parts.append(p_html)
-            content_html = '\n'.join(content_parts)
-        else:
-            # Fallback: get all text
-            content_html = str(content_div)
-            # Process <br> tags
-            content_html = re.sub(r'(<br\s*/?>){2,}', '</p><p>', content_html, flags=re.I)
-            content_html = re.sub(r'<br\s*/?>', '</p><p>', content_html, flags=re.I)
+        return chapter_title, clean_chapter_content(content_div)
 
-        return f"<div>{content_html}</div>"
+    def _fetch_chapter_page(self, chapter_url):
+        """Download a chapter page"""
+        response = self.session.get(chapter_url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+
+    async def _afetch_chapter_page(self, chapter_url):
+        """Async version of _fetch_chapter_page"""
+        response = await self.async_client.get(chapter_url)
+        response.raise_for_status()
+        return response.text
 
-    def crawl_all_chapters(self, chapters, delay=None, max_retries=None):
+    def get_chapter_content(self, chapter_url):
         """
-        Crawl content of all chapters, also fetch real chapter titles
+        Fetch content of a chapter
 
         Args:
-            chapters: List of chapters
-            delay: Delay time between requests
-            max_retries: Number of retries on error
+            chapter_url: URL of the chapter
 
         Returns:
-            List of dicts containing chapter information and content
+            String containing chapter content (HTML)
         """
-        if delay is None:
-            delay = DEFAULT_DELAY_BETWEEN_REQUESTS
-        if max_retries is None:
-            max_retries = DEFAULT_MAX_RETRIES
+        _, content = self._parse_chapter_page(self._fetch_chapter_page(chapter_url))
+        return content
 
-        print(f"\nĐang crawl nội dung {len(chapters)} chương...")
-
-        for idx, chapter in enumerate(chapters, 1):
-            retries = 0
-            success = False
-
-            while retries < max_retries and not success:
-                try:
-                    if retries == 0:
-                        print(f"  [{idx}/{len(chapters)}] {chapter['title']}...", end=' ')
-
-                    response = self.session.get(chapter['url'], timeout=DEFAULT_TIMEOUT)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-
-                    # Update chapter title from page
-                    title_tag = soup.select_one('.rv-chapt-title h2 a')
-                    if title_tag:
-                        chapter['title'] = title_tag.get_text(strip=True)
-
-                    # Get content
-                    content_div = soup.select_one('.chapter-c') or \
-                                 soup.select_one('#j_content')
-
-                    if not content_div:
-                        raise ValueError("Không tìm thấy nội dung")
-
-                    # Clean content
-                    for tag in content_div.find_all(['script', 'style', 'ins', 'iframe']):
-                        tag.decompose()
-                    for tag in content_div.find_all('div', id=re.compile(r'ads|banner', re.I)):
-                        tag.decompose()
-                    for tag in content_div.find_all('div', class_=re.compile(r'ads|banner', re.I)):
-                        tag.decompose()
-
-                    # Get paragraphs
-                    paragraphs = content_div.find_all('p')
-                    if paragraphs:
-                        content_parts = []
-                        for p in paragraphs:
-                            p_html = str(p)
-                            p_html = re.sub(r'<br\s*/?>\s*<br\s*/?>', '</p><p>', p_html, flags=re.I)
-                            p_html = re.sub(r'<br\s*/?>', '</p><p>', p_html, flags=re.I)
-                            content_parts.append(p_html)
-                        chapter['content'] = f"<div>{''.join(content_parts)}</div>"
-                    else:
-                        content_html = str(content_div)
-                        content_html = re.sub(r'(<br\s*/?>){2,}', '</p><p>', content_html, flags=re.I)
-                        content_html = re.sub(r'<br\s*/?>', '</p><p>', content_html, flags=re.I)
-                        chapter['content'] = f"<div>{content_html}</div>"
-
-                    print(f"✓ {chapter['title']}")
-                    success = True
-                    time.sleep(delay)
-
-                except Exception as e:
-                    retries += 1
-                    error_msg = str(e)
-                    if retries < max_retries:
-                        print(f"✗ ({error_msg}) - Thử lại {retries}/{max_retries}...", end=' ')
-                        time.sleep(delay * 2)
-                    else:
-                        print(f"✗ Bỏ qua ({error_msg})")
-                        chapter['content'] = f"<p>Lỗi khi tải chương sau {max_retries} lần thử: {error_msg}</p>"
-
-        return chapters
+    async def aget_chapter_content(self, chapter_url):
+        """Async version of get_chapter_content"""
+        _, content = self._parse_chapter_page(await self._afetch_chapter_page(chapter_url))
+        return content
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mirror mode: crawl one novel from every source that hosts it
+
+find_mirrors looks the novel up on the other registered sources (by
+slug, confirmed by title) and MirroredSource crawls through all of them:
+each chapter is fetched from the healthiest, fastest mirror, fails over
+to the next one when a request fails, and a slow request is raced
+against the next mirror after MIRROR_HEDGE_DELAY seconds. Requests are
+paced per host by the shared rate limiter, so a throttled host is
+paused while the others keep going.
+"""
+
+import re
+import time
+import asyncio
+import threading
+import unicodedata
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from config import MIRROR_HEDGE_DELAY, MIRROR_FAILURE_LIMIT, MIRROR_COOLDOWN, MIRROR_FETCH_THREADS
+from sources.base import BaseNovelSource
+from sources.hedge import race, arace
+from sources.metrics import stage
+from sources.rate_limiter import default_rate_limiter, response_info
+
+CHAPTER_NUMBER_PATTERN = re.compile(r'chuong-(\d+)')
+
+# Weight of the newest sample in a mirror's latency average
+LATENCY_SMOOTHING = 0.2
+
+
+def normalize_title(title):
+    """Lowercase title without accents or punctuation, for comparing novels"""
+    title = unicodedata.normalize('NFD', title.replace('Đ', 'D').replace('đ', 'd'))
+    title = ''.join(char for char in title if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', title.lower()))
+
+
+class Mirror:
+    """One source hosting the novel, with its chapter list and health"""
+
+    def __init__(self, source, novel_info, chapters):
+        self.source = source
+        self.novel_info = novel_info
+        self.chapters = chapters
+        self.lock = threading.Lock()
+        self.latency = None
+        self.failures = 0
+        self.down_until = 0.0
+        self._slug_index = None
+
+    @property
+    def name(self):
+        return self.source.name
+
+    def chapter_url(self, chapter):
+        """URL of `chapter` (from another mirror) on this mirror, or None"""
+        # Chapter N is usually at position N-1
+        match = CHAPTER_NUMBER_PATTERN.search(chapter.slug or '')
+        if match:
+            position = int(match.group(1)) - 1
+            if 0 <= position < len(self.chapters):
+                candidate = self.chapters[position]
+                if candidate.slug == chapter.slug:
+                    return candidate.url
+
+        with self.lock:
+            if self._slug_index is None:
+                self._slug_index = {entry.slug: position for position, entry in enumerate(self.chapters)}
+        position = self._slug_index.get(chapter.slug)
+        return self.chapters[position].url if position is not None else None
+
+    def is_healthy(self):
+        return time.monotonic() >= self.down_until
+
+    def record_success(self, latency):
+        with self.lock:
+            self.failures = 0
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += (latency - self.latency) * LATENCY_SMOOTHING
+
+    def record_failure(self, retry_after=None):
+        with self.lock:
+            self.failures += 1
+            if retry_after is not None:
+                self.down_until = max(self.down_until, time.monotonic() + retry_after)
+            elif self.failures >= MIRROR_FAILURE_LIMIT:
+                self.down_until = time.monotonic() + MIRROR_COOLDOWN
+                self.failures = 0
+
+
+class MirroredSource(BaseNovelSource):
+    """
+    Source crawling chapters from several mirrors of the same novel
+
+    Chapters keep the identity (URLs, titles, cache and journal keys) of
+    the primary mirror; only where the content is downloaded from changes.
+    """
+
+    def __init__(self, mirrors, hedge_delay=MIRROR_HEDGE_DELAY, rate_limiter=None):
+        """
+        Args:
+            mirrors: List of Mirror, the first one is the primary
+            hedge_delay: Seconds before racing the next mirror against a
+                slow request (None = only fail over on errors)
+            rate_limiter: HostRateLimiter pacing each mirror when the crawl
+                passes none, as in sequential mode (defaults to the shared one)
+        """
+        self.mirrors = mirrors
+        self.primary = mirrors[0]
+        self.hedge_delay = hedge_delay
+        self.rate_limiter = rate_limiter if rate_limiter is not None else default_rate_limiter
+        self.name = self.primary.name
+        self.base_url = self.primary.source.base_url
+        self.session = self.primary.source.session
+        self.failure_placeholder = self.primary.source.failure_placeholder
+        self.executor = ThreadPoolExecutor(max_workers=MIRROR_FETCH_THREADS)
+
+    def close(self):
+        """Stop the fetch threads (requests that lost a race are not waited for)"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def parse_novel_url(self, url):
+        return self.primary.source.parse_novel_url(url)
+
+    def get_chapter_list(self, novel_info, delay=0.5):
+        return self.primary.chapters
+
+    def get_chapter_content(self, chapter_url):
+        return self.primary.source.get_chapter_content(chapter_url)
+
+    def fetch_cover(self, novel_info):
+        return self.primary.source.fetch_cover(novel_info)
+
+    def _candidates(self, chapter):
+        """(mirror, url) pairs to try for a chapter, best first"""
+        candidates = []
+        for order, mirror in enumerate(self.mirrors):
+            url = chapter.url if mirror is self.primary else mirror.chapter_url(chapter)
+            if url:
+                # Unmeasured mirrors go first so that every mirror gets measured
+                candidates.append(((not mirror.is_healthy(), mirror.latency or 0.0, order), mirror, url))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [(mirror, url) for _, mirror, url in candidates]
+
+    def _fetch_from(self, mirror, url, rate_limiter=None, parse_pool=None):
+        """Download and parse a chapter page from one mirror"""
+        rate_limiter = rate_limiter or self.rate_limiter
+        rate_limiter.acquire(url)
+        started = time.monotonic()
+        try:
+            with stage('fetch'):
+                page_html = mirror.source._fetch_chapter_page(url)
+        except Exception as e:
+            status_code, retry_after = response_info(e)
+            rate_limiter.release(url, time.monotonic() - started, status_code, retry_after, error=True)
+            mirror.record_failure(retry_after)
+            raise
+        latency = time.monotonic() - started
+        rate_limiter.release(url, latency)
+        mirror.record_success(latency)
+
+        with stage('parse'):
+            return self._keep_primary_title(mirror, mirror.source._parse_page(page_html, parse_pool))
+
+    def _keep_primary_title(self, mirror, parsed):
+        """Drop the chapter title parsed from a secondary mirror (it may name chapters differently)"""
+        if mirror is self.primary:
+            return parsed
+        _, content = parsed
+        return None, content
+
+    def _crawl_chapter(self, chapter, rate_limiter=None, parse_pool=None, hedge_pool=None):
+        """
+        Fetch one chapter from the best mirror, failing over and hedging
+
+        Each request acquires rate_limiter for the host it actually goes
+        to. The requests run in the mirror's own threads, so hedge_pool is
+        not used. Raises the last error when every mirror failed.
+        """
+        calls = [partial(self._fetch_from, mirror, url, rate_limiter, parse_pool)
+                 for mirror, url in self._candidates(chapter)]
+        self._apply_parsed(chapter, race(self.executor, calls, self.hedge_delay))
+
+    async def _afetch_from(self, mirror, url, rate_limiter=None, parse_pool=None):
+        """Async version of _fetch_from"""
+        rate_limiter = rate_limiter or self.rate_limiter
+        await rate_limiter.acquire_async(url)
+        started = time.monotonic()
+        try:
+            with stage('fetch'):
+                page_html = await mirror.source._afetch_chapter_page(url)
+        except asyncio.CancelledError:
+            # Lost the race: give the slot back without blaming the mirror
+            rate_limiter.release(url, time.monotonic() - started)
+            raise
+        except Exception as e:
+            status_code, retry_after = response_info(e)
+            rate_limiter.release(url, time.monotonic() - started, status_code, retry_after, error=True)
+            mirror.record_failure(retry_after)
+            raise
+        latency = time.monotonic() - started
+        rate_limiter.release(url, latency)
+        mirror.record_success(latency)
+
+        with stage('parse'):
+            return self._keep_primary_title(mirror, await mirror.source._aparse_page(page_html, parse_pool))
+
+    async def _acrawl_chapter(self, chapter, rate_limiter=None, parse_pool=None):
+        """Async version of _crawl_chapter; requests that lose a race are cancelled"""
+        calls = [partial(self._afetch_from, mirror, url, rate_limiter, parse_pool)
+                 for mirror, url in self._candidates(chapter)]
+        self._apply_parsed(chapter, await arace(calls, self.hedge_delay))
+
+    def describe(self):
+        """One line per mirror with its health, for the end of a crawl"""
+        lines = []
+        for mirror in self.mirrors:
+            latency = f"{mirror.latency * 1000:.0f} ms" if mirror.latency is not None else "chưa dùng"
+            state = "tốt" if mirror.is_healthy() else "đang tạm ngưng"
+            lines.append(f"  {mirror.name}: {latency}, {state}")
+        return '\n'.join(lines)
+
+
+def find_mirrors(source, novel_info, chapters, candidates=None, urls=None):
+    """
+    Find the same novel on other sources
+
+    A source is a mirror when the novel page at the same slug (or at one
+    of `urls`) exists and has the same title.
+
+    Args:
+        source: Source instance the novel was found on (the primary mirror)
+        novel_info: Dict from source.parse_novel_url
+        chapters: Chapter list from source.get_chapter_list
+        candidates: Source instances to look on (defaults to one of every
+            other registered source)
+        urls: Novel URLs on other sources, for novels whose slug differs (optional)
+
+    Returns:
+        List of Mirror, the primary first
+    """
+    from sources import SOURCES, get_source_for_url
+
+    if candidates is None:
+        candidates = [entry.load()() for entry in SOURCES.values() if not isinstance(source, entry.load())]
+    by_class = {type(candidate): candidate for candidate in candidates}
+
+    lookups = []
+    for url in urls or ():
+        source_class = get_source_for_url(url)
+        if source_class is None:
+            print(f"✗ Không có nguồn nào hỗ trợ: {url}")
+            continue
+        lookups.append((by_class.get(source_class) or source_class(), url))
+    for candidate in candidates:
+        if not any(type(candidate) is type(other) for other, _ in lookups):
+            lookups.append((candidate, candidate.novel_url_for_slug(novel_info['novel_slug'])))
+
+    title = normalize_title(novel_info['novel_title'])
+    mirrors = [Mirror(source, novel_info, chapters)]
+    for candidate, url in lookups:
+        print(f"\nTìm bản sao trên {candidate.name}...")
+        try:
+            mirror_info = candidate.parse_novel_url(url)
+        except Exception as e:
+            print(f"✗ Không có trên {candidate.name} ({e})")
+            continue
+        if normalize_title(mirror_info['novel_title']) != title:
+            print(f"✗ {candidate.name}: khác truyện ({mirror_info['novel_title']})")
+            continue
+        mirror_chapters = candidate.get_chapter_list(mirror_info)
+        print(f"✓ Bản sao trên {candidate.name} ({len(mirror_chapters)} chương)")
+        mirrors.append(Mirror(candidate, mirror_info, mirror_chapters))
+
+    return mirrors
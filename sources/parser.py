@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTML parsing backend shared by all sources
+
+Every page goes through make_soup, which uses lxml (much faster than
+html.parser on large chapter pages) when it is installed.
+"""
+
+from bs4 import BeautifulSoup
+
+from config import HTML_PARSER
+
+
+def _detect_parser():
+    if HTML_PARSER:
+        return HTML_PARSER
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+PARSER = _detect_parser()
+
+
+def make_soup(markup):
+    """
+    Parse HTML with the configured backend
+
+    Args:
+        markup: HTML string
+
+    Returns:
+        BeautifulSoup object
+    """
+    return BeautifulSoup(markup, PARSER)
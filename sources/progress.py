@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Crawl progress events and their renderers
+
+The crawl (iter_crawl_chapters, crawl_all_chapters, acrawl_all_chapters)
+reports what happens through a `progress` callable instead of printing.
+It is called, possibly from several worker threads, with one event dict
+per step:
+
+    crawl_started   total
+    chapter_started index, total, title, url
+    retry           index, total, title, url, attempt, error, wait
+    chapter_done    index, total, title, url, saved_in, elapsed
+    failed          index, total, title, url, error, attempts, elapsed
+    crawl_finished  total, done, failed, retries, elapsed
+
+Every event also has 'event' (its name) and 'time' (time.time()).
+saved_in is 'fetched', 'cache' or 'journal'; elapsed is in seconds.
+
+Any callable can be passed; ProgressBar (the default) and
+JsonLinesReporter are provided.
+"""
+
+import sys
+import json
+import time
+import shutil
+import threading
+
+EVENTS = ('crawl_started', 'chapter_started', 'retry', 'chapter_done', 'failed', 'crawl_finished')
+
+
+def make_event(name, **fields):
+    """Build an event dict"""
+    return {'event': name, 'time': time.time(), **fields}
+
+
+def no_progress(event):
+    """Progress callable that ignores every event"""
+
+
+class ProgressBar:
+    """
+    Single progress line with rate and ETA, redrawn at most every `interval`
+
+    On a terminal the line is redrawn in place; failed chapters are
+    printed above it. When the stream is not a terminal (a log file) a
+    plain line is written every `log_interval` seconds instead.
+    """
+
+    def __init__(self, stream=None, interval=0.2, log_interval=10.0):
+        """
+        Args:
+            stream: Output stream (defaults to sys.stderr)
+            interval: Minimum seconds between two redraws on a terminal
+            log_interval: Seconds between two lines when not on a terminal
+        """
+        self.stream = stream if stream is not None else sys.stderr
+        self.is_tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = interval if self.is_tty else log_interval
+        self.lock = threading.Lock()
+        self._reset(0)
+
+    def _reset(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.retries = 0
+        self.started_at = time.monotonic()
+        self.drawn_at = 0.0
+
+    def __call__(self, event):
+        name = event['event']
+        with self.lock:
+            if name == 'crawl_started':
+                self._reset(event['total'])
+                return
+            if name == 'retry':
+                self.retries += 1
+            elif name == 'chapter_done':
+                self.done += 1
+            elif name == 'failed':
+                self.done += 1
+                self.failed += 1
+                self._write_above(f"  ✗ {event['title']}: {event['error']}")
+            elif name == 'crawl_finished':
+                self._draw(final=True)
+                return
+            else:
+                return
+
+            now = time.monotonic()
+            if now - self.drawn_at >= self.interval:
+                self.drawn_at = now
+                self._draw()
+
+    def _line(self):
+        elapsed = time.monotonic() - self.started_at
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        eta = _format_duration(remaining / rate) if rate > 0 else '--:--'
+        percent = self.done / self.total * 100 if self.total else 100.0
+
+        text = f" {self.done}/{self.total} {percent:5.1f}% {rate:6.1f} chương/s còn {eta}"
+        if self.failed or self.retries:
+            text += f" ({self.failed} lỗi, {self.retries} thử lại)"
+
+        if not self.is_tty:
+            return text.lstrip()
+        width = shutil.get_terminal_size((80, 20)).columns
+        bar_width = max(10, width - len(text) - 3)
+        filled = int(bar_width * self.done / self.total) if self.total else bar_width
+        return f"[{'#' * filled}{'.' * (bar_width - filled)}]{text}"[:width - 1]
+
+    def _draw(self, final=False):
+        if self.is_tty:
+            self.stream.write('\r\x1b[K' + self._line() + ('\n' if final else ''))
+        else:
+            self.stream.write(self._line() + '\n')
+        self.stream.flush()
+
+    def _write_above(self, text):
+        if self.is_tty:
+            self.stream.write('\r\x1b[K' + text + '\n')
+            self.drawn_at = 0.0
+        else:
+            self.stream.write(text + '\n')
+        self.stream.flush()
+
+
+class JsonLinesReporter:
+    """Writes every event as one JSON object per line, for logs"""
+
+    def __init__(self, stream=None, events=None):
+        """
+        Args:
+            stream: Output stream (defaults to sys.stderr)
+            events: Event names to write (defaults to all of them)
+        """
+        self.stream = stream if stream is not None else sys.stderr
+        self.events = frozenset(events) if events else None
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        if self.events is not None and event['event'] not in self.events:
+            return
+        line = json.dumps(event, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def get_progress(progress):
+    """Progress callable to use for a `progress` argument (None = ProgressBar)"""
+    return ProgressBar() if progress is None else progress
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
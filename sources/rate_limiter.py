@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rate limiting and congestion control shared by all sources
+"""
+
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from config import (
+    DEFAULT_RATE_LIMIT_PER_HOST, DEFAULT_RATE_LIMIT_BURST, DEFAULT_BACKOFF_MAX,
+    ADAPTIVE_INITIAL_CONCURRENCY, ADAPTIVE_MIN_CONCURRENCY, ADAPTIVE_MAX_CONCURRENCY,
+    ADAPTIVE_LATENCY_TOLERANCE, ADAPTIVE_MAX_RATE_PER_HOST
+)
+
+# Responses that mean "slow down"
+THROTTLE_STATUS_CODES = frozenset([429, 503])
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value
+
+    Args:
+        value: Header value (seconds or HTTP date), may be None
+
+    Returns:
+        Seconds to wait, or None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def response_info(error):
+    """
+    Get (status code, Retry-After seconds) from a request exception
+
+    Works with requests.HTTPError and http_client.HTTPStatusError; both
+    carry the response in `response`.
+    """
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None, None
+    return response.status_code, parse_retry_after(response.headers.get('Retry-After'))
+
+
+def backoff_delay(attempt, base, retry_after=None):
+    """
+    Delay before retry number `attempt` (1-based)
+
+    Exponential backoff with jitter, capped at DEFAULT_BACKOFF_MAX; a
+    Retry-After sent by the server wins.
+    """
+    if retry_after is not None:
+        return min(retry_after, DEFAULT_BACKOFF_MAX)
+    return min(DEFAULT_BACKOFF_MAX, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate, capacity):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _try_consume(self):
+        """Consume one token if available, otherwise return seconds to wait"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def try_acquire(self):
+        """Consume one token if one is available right now"""
+        return not self._try_consume()
+
+    def set_rate(self, rate):
+        """Change the refill rate; tokens earned so far are kept"""
+        with self.lock:
+            self._refill()
+            self.rate = rate
+
+    def acquire(self):
+        """Block until one token is available, then consume it"""
+        while True:
+            wait = self._try_consume()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a token is available"""
+        while True:
+            wait = self._try_consume()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host"""
+
+    def __init__(self, rate=None, capacity=None):
+        """
+        Args:
+            rate: Requests per second allowed for each host
+            capacity: Burst size for each host
+        """
+        self.rate = rate if rate is not None else DEFAULT_RATE_LIMIT_PER_HOST
+        self.capacity = capacity if capacity is not None else DEFAULT_RATE_LIMIT_BURST
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, url):
+        """Get (or create) the bucket for the host of url"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        """Block until a request to the host of url is allowed"""
+        self.get_bucket(url).acquire()
+
+    async def acquire_async(self, url):
+        """Async version of acquire"""
+        await self.get_bucket(url).acquire_async()
+
+    @property
+    def host_limiter(self):
+        """The limiter pacing the hosts themselves (itself; wrappers return the one they wrap)"""
+        return self
+
+    def try_acquire(self, url):
+        """Like acquire, but only if the request is allowed right now; returns whether it is"""
+        return self.get_bucket(url).try_acquire()
+
+    async def try_acquire_async(self, url):
+        """Async version of try_acquire"""
+        return self.try_acquire(url)
+
+    def release(self, url, latency, status_code=None, retry_after=None, error=False):
+        """
+        Report the outcome of a request started with acquire
+
+        Args:
+            url: Requested URL
+            latency: Request duration (seconds)
+            status_code: HTTP status of a failed request (optional)
+            retry_after: Retry-After of a failed request, in seconds (optional)
+            error: Whether the request failed
+        """
+        pass
+
+
+class _HostCongestion:
+    """AIMD congestion state of one host"""
+
+    def __init__(self):
+        self.limit = float(ADAPTIVE_INITIAL_CONCURRENCY)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.base_latency = None
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """
+    Per-host congestion controller in the spirit of AIMD
+
+    Each host gets a concurrency window: it grows by about one request
+    per window of healthy responses, shrinks multiplicatively when
+    latency climbs well above the best seen or requests fail, is halved
+    on 429/503, and the host is paused for Retry-After when the server
+    sends one. The token bucket of the host follows the window: `rate`
+    requests per second at the initial window, proportionally more or
+    less as it grows or shrinks, never above `max_rate`.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, rate=None, capacity=None, max_rate=None):
+        """
+        Args:
+            rate: Requests per second for each host at the initial window
+            capacity: Burst size for each host
+            max_rate: Ceiling of the requests per second of each host
+        """
+        super().__init__(rate, capacity)
+        self.max_rate = max_rate if max_rate is not None else ADAPTIVE_MAX_RATE_PER_HOST
+        self.hosts = {}
+
+    def get_host(self, url):
+        """Get (or create) the congestion state for the host of url"""
+        host = urlparse(url).netloc
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = _HostCongestion()
+                self.hosts[host] = state
+            return state
+
+    def _try_enter(self, state):
+        """Take a slot in the window, otherwise return seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.in_flight >= int(state.limit):
+                return self.POLL_INTERVAL
+            state.in_flight += 1
+            return 0
+
+    def acquire(self, url):
+        """Block until the host has room in its window and a token is available"""
+        state = self.get_host(url)
+        while True:
+            wait = self._try_enter(state)
+            if not wait:
+                break
+            time.sleep(wait)
+        super().acquire(url)
+
+    async def acquire_async(self, url):
+        """Async version of acquire"""
+        state = self.get_host(url)
+        while True:
+            wait = self._try_enter(state)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+        await super().acquire_async(url)
+
+    def try_acquire(self, url):
+        state = self.get_host(url)
+        if self._try_enter(state):
+            return False
+        if not super().try_acquire(url):
+            with self.lock:
+                state.in_flight = max(0, state.in_flight - 1)
+            return False
+        return True
+
+    def release(self, url, latency, status_code=None, retry_after=None, error=False):
+        state = self.get_host(url)
+        with self.lock:
+            self._update_window(state, latency, status_code, retry_after, error)
+            limit = state.limit
+        rate = min(self.max_rate, self.rate * limit / ADAPTIVE_INITIAL_CONCURRENCY)
+        self.get_bucket(url).set_rate(rate)
+
+    def _update_window(self, state, latency, status_code, retry_after, error):
+        """Apply AIMD to the window of a host (self.lock held)"""
+        state.in_flight = max(0, state.in_flight - 1)
+
+        if status_code in THROTTLE_STATUS_CODES:
+            # Throttled: halve the window and pause the host
+            state.limit = max(ADAPTIVE_MIN_CONCURRENCY, state.limit / 2)
+            pause = retry_after if retry_after is not None else backoff_delay(1, 1.0)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + pause)
+            return
+
+        if error:
+            state.limit = max(ADAPTIVE_MIN_CONCURRENCY, state.limit * 0.75)
+            return
+
+        if state.base_latency is None or latency < state.base_latency:
+            state.base_latency = latency
+        else:
+            # Let the baseline follow slow drifts of the server
+            state.base_latency = state.base_latency * 0.99 + latency * 0.01
+
+        if latency > state.base_latency * ADAPTIVE_LATENCY_TOLERANCE:
+            state.limit = max(ADAPTIVE_MIN_CONCURRENCY, state.limit * 0.9)
+        else:
+            state.limit = min(ADAPTIVE_MAX_CONCURRENCY, state.limit + 1 / state.limit)
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the requests one crawl has in flight, on top of a HostRateLimiter
+
+    Acquired around each download only, so a chapter waiting for its page
+    to be parsed does not keep a download from starting. A limiter serves
+    either threads or asyncio tasks (`asynchronous`), not both.
+    """
+
+    def __init__(self, rate_limiter, limit, asynchronous=False):
+        """
+        Args:
+            rate_limiter: HostRateLimiter pacing the requests
+            limit: Maximum number of requests in flight
+            asynchronous: Whether it is used with acquire_async
+        """
+        self.rate_limiter = rate_limiter
+        self.asynchronous = asynchronous
+        if asynchronous:
+            self.semaphore = asyncio.Semaphore(max(1, limit))
+        else:
+            self.semaphore = threading.BoundedSemaphore(max(1, limit))
+
+    def acquire(self, url):
+        self.semaphore.acquire()
+        try:
+            self.rate_limiter.acquire(url)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    async def acquire_async(self, url):
+        await self.semaphore.acquire()
+        try:
+            await self.rate_limiter.acquire_async(url)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    @property
+    def host_limiter(self):
+        # A hedge rides on the slot of the request it duplicates, so it
+        # only goes through the host's limits
+        return self.rate_limiter
+
+    def release(self, url, latency, status_code=None, retry_after=None, error=False):
+        try:
+            self.rate_limiter.release(url, latency, status_code, retry_after, error)
+        finally:
+            self.semaphore.release()
+
+
+# Shared by every source instance so that several crawls in one process
+# never exceed the per-host limits together
+default_rate_limiter = AdaptiveRateLimiter()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Declarative, precompiled extraction specs for sources
+
+A source declares its CSS selectors (with fallback chains) and regex
+patterns once as a class attribute; they are compiled when the class is
+defined, so parsing a page does no selector or regex setup.
+"""
+
+import re
+
+import soupsieve
+
+
+class ExtractionSpec:
+    """Compiled selectors and patterns of a source"""
+
+    def __init__(self, selectors=None, patterns=None):
+        """
+        Args:
+            selectors: dict name -> CSS selector, or tuple of selectors tried
+                in order (fallback chain)
+            patterns: dict name -> regex string, or (regex string, flags)
+        """
+        self.selectors = {}
+        for name, chain in (selectors or {}).items():
+            if isinstance(chain, str):
+                chain = (chain,)
+            self.selectors[name] = tuple(soupsieve.compile(selector) for selector in chain)
+
+        self.patterns = {}
+        for name, pattern in (patterns or {}).items():
+            if isinstance(pattern, tuple):
+                self.patterns[name] = re.compile(*pattern)
+            else:
+                self.patterns[name] = re.compile(pattern)
+
+    def select_one(self, soup, name):
+        """
+        First element matched by the fallback chain `name`
+
+        Args:
+            soup: BeautifulSoup object or Tag to search in
+            name: Selector name
+
+        Returns:
+            Tag or None
+        """
+        for selector in self.selectors[name]:
+            element = selector.select_one(soup)
+            if element is not None:
+                return element
+        return None
+
+    def select(self, soup, name):
+        """All elements matched by the first selector of `name` that matches anything"""
+        for selector in self.selectors[name]:
+            elements = selector.select(soup)
+            if elements:
+                return elements
+        return []
+
+    def pattern(self, name):
+        """Compiled regex `name`"""
+        return self.patterns[name]
+
+    def search(self, name, text):
+        """re.search with the compiled pattern `name`"""
+        return self.patterns[name].search(text)
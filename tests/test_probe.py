@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+probe() reads the novel page in chunks and must not trust a number cut
+at the end of a chunk
+
+Run from the repository root: python -m unittest discover tests
+"""
+
+import unittest
+
+from benchmarks.mock_server import MockSite
+from sources.metruyenchu_com_vn import MetruyenchuComVnSource
+from sources.metruyenhot_me import MetruyenhotMeSource
+
+TOTAL_CHAPTERS = 1234
+
+
+class SplitSession:
+    """Session whose streamed responses arrive in two chunks, cut at `cut` bytes"""
+
+    def __init__(self, session, cut):
+        self.session = session
+        self.cut = cut
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        if kwargs.get('stream'):
+            body = response.content
+            response.iter_content = lambda chunk_size=1: iter([body[:self.cut], body[self.cut:]])
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+class ProbeChunkTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = MockSite(chapters=TOTAL_CHAPTERS).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.site.stop()
+
+    def assert_probe_with_cuts(self, source, url, expected):
+        page = source.session.get(url).content
+        session = source.session
+        number = str(TOTAL_CHAPTERS).encode()
+        start = page.find(number)
+        self.assertNotEqual(start, -1)
+        try:
+            while start != -1:
+                # Cut inside every occurrence of the number
+                for cut in range(start + 1, start + len(number)):
+                    source.session = SplitSession(session, cut)
+                    with self.subTest(cut=cut):
+                        self.assertEqual(source.probe(url), expected)
+                start = page.find(number, start + 1)
+        finally:
+            source.session = session
+
+    def test_metruyenchu(self):
+        source = MetruyenchuComVnSource()
+        self.assert_probe_with_cuts(source, self.site.novel_url('metruyenchu.com.vn'), {
+            'total_chapters': TOTAL_CHAPTERS, 'latest_slug': f'chuong-{TOTAL_CHAPTERS}'
+        })
+
+    def test_metruyenhot(self):
+        source = MetruyenhotMeSource()
+        self.assert_probe_with_cuts(source, self.site.novel_url('metruyenhot.me'), {
+            'total_chapters': TOTAL_CHAPTERS, 'latest_slug': f'chuong-{TOTAL_CHAPTERS}'
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()